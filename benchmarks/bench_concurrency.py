@@ -0,0 +1,126 @@
+"""Параллельные чтения ленты и запись комментариев в SQLite.
+
+Процессы-читатели запрашивают главную страницу, процессы-писатели
+добавляют комментарии, как рабочие процессы gunicorn. Замер
+повторяется для журнала отката (режим SQLite по умолчанию) и для
+настроек SQLITE_PRAGMAS с WAL; выводятся пропускная способность
+и число ошибок «database is locked». Кэш страниц отключен, чтобы
+каждый запрос обращался к БД.
+"""
+import multiprocessing
+import time
+
+from common import base_parser, ensure_posts, percentile, setup_django
+
+CONFIGS = (
+    ('журнал отката', {'journal_mode': 'DELETE'}, False),
+    ('WAL и PRAGMA', None, True),
+)
+
+
+def run_worker(role, duration, post_ids, username, results):
+    from django.db import OperationalError
+    from django.test import Client
+
+    client = Client()
+    if role == 'writer':
+        from django.contrib.auth import get_user_model
+        client.force_login(get_user_model().objects.get(username=username))
+    done = errors = 0
+    timings = []
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                if role == 'reader':
+                    response = client.get('/')
+                else:
+                    post_id = post_ids[done % len(post_ids)]
+                    response = client.post(f'/posts/{post_id}/comment/',
+                                           {'text': 'Комментарий'})
+            except OperationalError:
+                errors += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code < 400:
+                done += 1
+            else:
+                errors += 1
+    finally:
+        # Результат отправляется и при падении процесса, иначе
+        # родитель ждал бы его бесконечно
+        results.put((role, done, errors, timings))
+
+
+def run_config(context, args, post_ids, username):
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(
+            role, args.duration, post_ids, username, results))
+        for role, number in (('reader', args.readers),
+                             ('writer', args.writers))
+        for _ in range(number)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'reader': [0, 0, []], 'writer': [0, 0, []]}
+    for _ in processes:
+        role, done, errors, timings = results.get()
+        totals[role][0] += done
+        totals[role][1] += errors
+        totals[role][2] += timings
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main():
+    parser = base_parser(__doc__.splitlines()[0])
+    parser.add_argument('--posts', default=10_000, type=int,
+                        help='Число публикаций в таблице.')
+    parser.add_argument('--readers', default=4, type=int,
+                        help='Число процессов, читающих ленту.')
+    parser.add_argument('--writers', default=4, type=int,
+                        help='Число процессов, добавляющих комментарии.')
+    parser.add_argument('--duration', default=10, type=float,
+                        help='Длительность замера каждой настройки, с.')
+    args = parser.parse_args()
+
+    from django.conf import settings
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    setup_django(args.db)
+    ensure_posts(args.posts)
+
+    from django.db import connection, connections
+
+    from blog.models import Post
+
+    post_ids = list(Post.objects.filter(is_visible=True).order_by(
+        '-pub_date').values_list('pk', flat=True)[:100])
+    username = 'bench'
+    tuned = settings.SQLITE_PRAGMAS
+    context = multiprocessing.get_context('fork')
+
+    print(f'{"настройка":>16} {"чтений/с":>10} {"записей/с":>10}'
+          f' {"ошибок":>8} {"p95 записи, мс":>15}')
+    for name, pragmas, immediate in CONFIGS:
+        settings.SQLITE_PRAGMAS = tuned if pragmas is None else pragmas
+        settings.SQLITE_IMMEDIATE_TRANSACTIONS = immediate
+        # Режим журнала хранится в файле БД: новое соединение
+        # переключает его до запуска процессов
+        connections.close_all()
+        connection.ensure_connection()
+        connections.close_all()
+        totals = run_config(context, args, post_ids, username)
+        reads, read_errors, _ = totals['reader']
+        writes, write_errors, write_timings = totals['writer']
+        p95 = percentile(write_timings, 95) if write_timings else 0
+        print(f'{name:>16} {reads / args.duration:>10.1f}'
+              f' {writes / args.duration:>10.1f}'
+              f' {read_errors + write_errors:>8} {p95:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
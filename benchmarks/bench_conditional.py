@@ -0,0 +1,41 @@
+"""Стоимость ответа 304 по сравнению с полным построением страницы."""
+from common import base_parser, ensure_posts, measure, setup_django
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--posts', default=100_000, type=int,
+                        help='Число публикаций в таблице.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    ensure_posts(args.posts)
+
+    from django.core.cache import cache
+    from django.test import Client
+
+    from blog.models import Post
+
+    client = Client()
+    post = Post.objects.filter(is_visible=True).latest('pub_date')
+    urls = ('/', '/category/bench/', f'/profile/{post.author.username}/',
+            f'/posts/{post.pk}/')
+
+    def full_render(url):
+        # Очистка кэша сбрасывает и кэш страниц, и кэш числа публикаций
+        cache.clear()
+        client.get(url)
+
+    print(f'{"страница":>24} {"рендеринг, мс":>16} {"из кэша, мс":>14}'
+          f' {"304, мс":>10}')
+    for url in urls:
+        render_median, _ = measure(lambda: full_render(url), args.repeat)
+        etag = client.get(url)['ETag']
+        cached_median, _ = measure(lambda: client.get(url), args.repeat)
+        not_modified_median, _ = measure(
+            lambda: client.get(url, HTTP_IF_NONE_MATCH=etag), args.repeat)
+        print(f'{url:>24} {render_median:>16.2f} {cached_median:>14.2f}'
+              f' {not_modified_median:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
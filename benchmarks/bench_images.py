@@ -0,0 +1,56 @@
+"""Объем изображений на странице ленты до и после обработки при загрузке."""
+import statistics
+from io import BytesIO
+
+from common import base_parser
+
+CAMERA_SIZE = (4032, 3024)
+
+
+def camera_jpeg(seed):
+    """Синтетический снимок с камеры: шум, EXIF, качество 95."""
+    from PIL import Image
+
+    noise = Image.effect_noise(CAMERA_SIZE, 40 + seed % 20)
+    gradient = Image.linear_gradient('L').resize(CAMERA_SIZE)
+    image = Image.merge('RGB', (noise, gradient, noise.rotate(180)))
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera'
+    exif[0x0112] = 1
+    output = BytesIO()
+    image.save(output, 'JPEG', quality=95, exif=exif)
+    return output.getvalue()
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--images', default=5, type=int,
+                        help='Число разных исходных снимков.')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from blog.images import process_post_image
+    from blog.views import POSTS_NUMBER
+
+    original_sizes, processed_sizes = [], []
+    for seed in range(args.images):
+        content = camera_jpeg(seed)
+        processed = process_post_image(SimpleUploadedFile(
+            'IMG.JPG', content, content_type='image/jpeg'))
+        original_sizes.append(len(content))
+        processed_sizes.append(processed.size)
+
+    original = statistics.mean(original_sizes) * POSTS_NUMBER
+    processed = statistics.mean(processed_sizes) * POSTS_NUMBER
+    print(f'Публикаций на странице: {POSTS_NUMBER}')
+    print(f'{"до обработки, КБ":>24} {original / 1024:>12.0f}')
+    print(f'{"после обработки, КБ":>24} {processed / 1024:>12.0f}')
+    print(f'{"сокращение":>24} {original / processed:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Сравнение постраничной (OFFSET) и keyset-пагинации главной ленты."""
+from common import base_parser, ensure_posts, measure, setup_django
+
+DEPTHS = (1, 10, 100, 1_000, 10_000, 50_000, 99_000)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--posts', default=1_000_000, type=int,
+                        help='Число публикаций в таблице.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    ensure_posts(args.posts)
+
+    from django.core.paginator import Paginator
+
+    from blog.models import Post
+    from blog.paginators import CursorPaginator
+    from blog.querysets import post_query
+    from blog.views import POSTS_NUMBER
+
+    queryset = post_query(Post.objects)
+    cursor_paginator = CursorPaginator(queryset, POSTS_NUMBER)
+    offset_paginator = Paginator(
+        queryset.order_by('-pub_date', '-id'), POSTS_NUMBER)
+
+    print(f'{"страница":>10} {"OFFSET, мс":>16} {"keyset, мс":>16}')
+    for depth in DEPTHS:
+        if depth > offset_paginator.num_pages:
+            break
+        # Курсор на нужную глубину готовится вне замера: в реальной
+        # навигации он приходит из ссылки предыдущей страницы.
+        cursor = None
+        if depth > 1:
+            anchor = offset_paginator.object_list[
+                (depth - 1) * POSTS_NUMBER - 1]
+            cursor = cursor_paginator.encode_cursor('next', anchor)
+        offset_median, _ = measure(
+            lambda: list(offset_paginator.page(depth)), args.repeat)
+        keyset_median, _ = measure(
+            lambda: list(cursor_paginator.page(cursor)), args.repeat)
+        print(f'{depth:>10} {offset_median:>16.2f} {keyset_median:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
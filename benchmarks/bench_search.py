@@ -0,0 +1,42 @@
+"""Сравнение поиска через icontains и полнотекстового индекса FTS5."""
+from common import base_parser, ensure_posts, measure, setup_django
+
+# Редкое слово (номер одной публикации) и слово из каждой публикации
+QUERIES = ('123457', 'публикации')
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--posts', default=1_000_000, type=int,
+                        help='Число публикаций в таблице.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    ensure_posts(args.posts)
+
+    from django.db.models import Q
+
+    from blog.models import Post
+    from blog.paginators import CursorPaginator
+    from blog.querysets import post_query, posts_search, search_query
+    from blog.views import POSTS_NUMBER
+
+    def icontains_page(text):
+        queryset = post_query(Post.objects).filter(
+            Q(title__icontains=text) | Q(text__icontains=text))
+        return list(CursorPaginator(queryset, POSTS_NUMBER).page())
+
+    def fts_page(text):
+        queryset = posts_search(post_query(Post.objects), search_query(text))
+        return list(CursorPaginator(
+            queryset, POSTS_NUMBER, ordering=('rank', 'id')).page())
+
+    print(f'{"запрос":>12} {"icontains, мс":>16} {"FTS5, мс":>12}')
+    for text in QUERIES:
+        icontains_median, _ = measure(lambda: icontains_page(text),
+                                      args.repeat)
+        fts_median, _ = measure(lambda: fts_page(text), args.repeat)
+        print(f'{text:>12} {icontains_median:>16.2f} {fts_median:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
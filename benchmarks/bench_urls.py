@@ -0,0 +1,171 @@
+"""Замеры основных страниц с бюджетами на число запросов и время ответа.
+
+Запросы выполняются в том же процессе через обработчик Django с полным
+набором middleware. Для каждой страницы измеряются процентили времени
+ответа, число SQL-запросов и размер ответа. Кэш очищается перед каждым
+запросом (вне замера), поэтому измеряется полное построение страницы.
+
+Результаты сравниваются с базовыми значениями из baselines.json:
+скрипт завершается с кодом 1, если страница делает больше запросов,
+чем записано (с запасом --query-margin), или ее медианное время
+превышает базовое больше, чем на долю --margin. Новые базовые
+значения записываются с флагом --update.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+from common import (BASE_DIR, base_parser, ensure_dataset, percentile,
+                    setup_django)
+
+BASELINES = Path(__file__).resolve().parent / 'baselines.json'
+DEFAULT_DB = BASE_DIR / 'benchmarks' / 'urls.sqlite3'
+DATASET = {
+    'users': 500,
+    'categories': 10,
+    'locations': 20,
+    'posts': 20_000,
+    'comments': 100_000,
+    'viral': 1,
+    'viral_comments': 20_000,
+    'seed': 1,
+}
+
+
+def build_cases():
+    """Страницы для замера: имя, метод, URL, данные и пользователь."""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+
+    from blog.models import Category, Post
+    from blog.paginators import CursorPaginator
+    from blog.querysets import post_query
+    from blog.views import POSTS_NUMBER
+
+    posts = post_query(Post.objects)
+    category = Category.objects.filter(is_published=True).annotate(
+        number=Count('posts')).order_by('-number', 'pk').first()
+    owner = get_user_model().objects.annotate(
+        number=Count('posts')).order_by('-number', 'pk').first()
+    stranger = get_user_model().objects.exclude(pk=owner.pk).first()
+    viral = posts.order_by('-comment_count', 'pk').first()
+    commented = posts.order_by('pk').first()
+
+    pages = posts.count() // POSTS_NUMBER
+    deep_page = max(1, pages // 2)
+    paginator = CursorPaginator(posts, POSTS_NUMBER)
+    anchor = posts.order_by('-pub_date', '-id')[
+        deep_page * POSTS_NUMBER - 1]
+    deep_cursor = paginator.encode_cursor('next', anchor)
+    return [
+        ('index', 'get', '/', {}, None),
+        ('index_deep_page', 'get', '/', {'page': deep_page}, None),
+        ('index_deep_cursor', 'get', '/', {'cursor': deep_cursor}, None),
+        ('category_posts', 'get', f'/category/{category.slug}/', {}, None),
+        ('profile_owner', 'get', f'/profile/{owner.username}/', {}, owner),
+        ('profile_stranger', 'get', f'/profile/{owner.username}/', {},
+         stranger),
+        ('post_detail', 'get', f'/posts/{viral.pk}/', {}, None),
+        ('add_comment', 'post', f'/posts/{commented.pk}/comment/',
+         {'text': 'Комментарий для замера'}, stranger),
+    ]
+
+
+def measure_case(client, method, url, data, repeat):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{url}: ответ {response.status_code}')
+    return {
+        'queries': len(queries),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'bytes': size,
+    }
+
+
+def check(name, result, baseline, margin, query_margin):
+    """Превышения бюджетов страницы в виде списка сообщений."""
+    if baseline is None:
+        return []
+    errors = []
+    if result['queries'] > baseline['queries'] + query_margin:
+        errors.append(f'{name}: {result["queries"]} запросов '
+                      f'вместо {baseline["queries"]}')
+    budget = baseline['p50_ms'] * (1 + margin)
+    if result['p50_ms'] > budget:
+        errors.append(f'{name}: медиана {result["p50_ms"]} мс '
+                      f'больше бюджета {budget:.2f} мс')
+    return errors
+
+
+def main():
+    parser = base_parser(__doc__.splitlines()[0])
+    parser.set_defaults(db=DEFAULT_DB)
+    parser.add_argument('--margin', default=0.25, type=float,
+                        help='Допустимый рост медианы относительно базовой.')
+    parser.add_argument('--query-margin', default=0, type=int,
+                        help='Допустимое число лишних SQL-запросов.')
+    parser.add_argument('--update', action='store_true',
+                        help='Записать результаты как базовые значения.')
+    parser.add_argument('--only', nargs='*',
+                        help='Замерить только перечисленные страницы.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    ensure_dataset(**DATASET)
+
+    from django.test import Client
+
+    baselines = {'dataset': DATASET, 'views': {}}
+    if BASELINES.exists():
+        baselines = json.loads(BASELINES.read_text(encoding='utf-8'))
+    if baselines['dataset'] != DATASET:
+        print('Базовые значения записаны для других данных.', file=sys.stderr)
+
+    print(f'{"страница":>18} {"запросы":>8} {"p50, мс":>9} {"p95, мс":>9}'
+          f' {"p99, мс":>9} {"байты":>8}')
+    errors = []
+    for name, method, url, data, user in build_cases():
+        if args.only and name not in args.only:
+            continue
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        result = measure_case(client, method, url, data, args.repeat)
+        print(f'{name:>18} {result["queries"]:>8} {result["p50_ms"]:>9}'
+              f' {result["p95_ms"]:>9} {result["p99_ms"]:>9}'
+              f' {result["bytes"]:>8}')
+        if args.update:
+            baselines['views'][name] = result
+        else:
+            errors += check(name, result, baselines['views'].get(name),
+                            args.margin, args.query_margin)
+
+    if args.update:
+        baselines['dataset'] = DATASET
+        BASELINES.write_text(
+            json.dumps(baselines, ensure_ascii=False, indent=2) + '\n',
+            encoding='utf-8')
+        print(f'Базовые значения записаны в {BASELINES}.')
+    if errors:
+        print('\n'.join(['Превышены бюджеты:', *errors]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Нагрузочный тест записи комментариев с очередью записи и без нее.
+
+Процессы (как рабочие процессы gunicorn) с несколькими потоками
+в каждом добавляют комментарии с заданной суммарной частотой. Замер
+повторяется без очереди записи и с SQLITE_WRITE_QUEUE 'process'
+и 'host'; выводятся достигнутое число записей в секунду, число ошибок
+«database is locked» и задержки записи. Параметр --busy-timeout
+уменьшает время ожидания блокировки SQLite, чтобы ошибки проявились
+при меньшей нагрузке.
+"""
+import multiprocessing
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import base_parser, ensure_posts, percentile, setup_django
+
+CONFIGS = (
+    ('без очереди', ''),
+    ('process', 'process'),
+    ('host', 'host'),
+)
+
+
+def run_thread(args, interval, offset, post_ids, session_key, stats):
+    from django.conf import settings
+    from django.db import OperationalError, connection
+    from django.test import Client
+
+    client = Client()
+    # Сессия создана заранее: вход в каждом потоке писал бы в БД
+    # вне очереди записи
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    started_at = time.monotonic() + offset
+    deadline = started_at + args.duration
+    number = 0
+    try:
+        while True:
+            # Запись по расписанию: задержки не снижают частоту
+            scheduled = started_at + number * interval
+            if scheduled >= deadline:
+                break
+            time.sleep(max(0, scheduled - time.monotonic()))
+            post_id = post_ids[number % len(post_ids)]
+            number += 1
+            started = time.perf_counter()
+            try:
+                response = client.post(f'/posts/{post_id}/comment/',
+                                       {'text': 'Комментарий'})
+            except OperationalError:
+                stats['errors'] += 1
+                continue
+            if response.status_code < 400:
+                stats['done'] += 1
+                stats['timings'].append(
+                    (time.perf_counter() - started) * 1000)
+            else:
+                stats['errors'] += 1
+    finally:
+        connection.close()
+
+
+def run_process(args, post_ids, session_key, results):
+    stats = {'done': 0, 'errors': 0, 'timings': []}
+    workers = args.processes * args.threads
+    interval = workers / args.rate
+    try:
+        threads = [
+            threading.Thread(target=run_thread, args=(
+                args, interval, interval * index / args.threads,
+                post_ids, session_key, stats))
+            for index in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        results.put(stats)
+
+
+def run_config(context, args, post_ids, session_key):
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_process,
+                        args=(args, post_ids, session_key, results))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'done': 0, 'errors': 0, 'timings': []}
+    for _ in processes:
+        stats = results.get()
+        totals['done'] += stats['done']
+        totals['errors'] += stats['errors']
+        totals['timings'] += stats['timings']
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main():
+    parser = base_parser(__doc__.splitlines()[0])
+    parser.add_argument('--posts', default=10_000, type=int,
+                        help='Число публикаций в таблице.')
+    parser.add_argument('--processes', default=4, type=int,
+                        help='Число процессов сервера.')
+    parser.add_argument('--threads', default=4, type=int,
+                        help='Число потоков в каждом процессе.')
+    parser.add_argument('--rate', default=200, type=float,
+                        help='Суммарная частота записи, записей в секунду.')
+    parser.add_argument('--duration', default=10, type=float,
+                        help='Длительность замера каждой настройки, с.')
+    parser.add_argument('--busy-timeout', type=int,
+                        help='PRAGMA busy_timeout в миллисекундах.')
+    args = parser.parse_args()
+
+    from django.conf import settings
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    setup_django(args.db)
+    if args.busy_timeout is not None:
+        settings.SQLITE_PRAGMAS = {
+            **settings.SQLITE_PRAGMAS, 'busy_timeout': args.busy_timeout}
+    ensure_posts(args.posts)
+
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.test import Client
+
+    from blog.models import Post
+
+    post_ids = list(Post.objects.filter(is_visible=True).order_by(
+        '-pub_date').values_list('pk', flat=True)[:100])
+    client = Client()
+    client.force_login(get_user_model().objects.get(username='bench'))
+    session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+
+    print(f'{"очередь":>12} {"записей/с":>10} {"ошибок":>8}'
+          f' {"p50, мс":>9} {"p95, мс":>9}')
+    with tempfile.TemporaryDirectory() as lock_dir:
+        settings.SQLITE_WRITE_LOCK_FILE = Path(lock_dir) / 'db.lock'
+        for name, mode in CONFIGS:
+            settings.SQLITE_WRITE_QUEUE = mode
+            totals = run_config(context, args, post_ids, session_key)
+            timings = totals['timings'] or [0]
+            print(f'{name:>12} {totals["done"] / args.duration:>10.1f}'
+                  f' {totals["errors"]:>8}'
+                  f' {percentile(timings, 50):>9.1f}'
+                  f' {percentile(timings, 95):>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
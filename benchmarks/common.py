@@ -0,0 +1,123 @@
+"""Общая подготовка окружения для скриптов замеров производительности.
+
+Скрипты запускаются из корня репозитория, например:
+
+    python benchmarks/bench_pagination.py --posts 1000000
+
+База данных для замеров отдельная (по умолчанию benchmarks/bench.sqlite3)
+и переиспользуется между запусками, чтобы не генерировать данные заново.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB = BASE_DIR / 'benchmarks' / 'bench.sqlite3'
+
+sys.path.insert(0, str(BASE_DIR / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+# Строки журнала запросов мешают выводу замеров
+os.environ.setdefault('REQUEST_LOG_LEVEL', 'WARNING')
+
+
+def setup_django(db_path=DEFAULT_DB):
+    """Настройка Django на отдельную базу и применение миграций."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DEBUG = False
+    # Детектор N+1 разбирает стек вызовов и искажает замеры
+    settings.NPLUSONE_DETECTION = ''
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def base_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--db', default=DEFAULT_DB, type=Path,
+                        help='Путь к файлу SQLite для замеров.')
+    parser.add_argument('--repeat', default=20, type=int,
+                        help='Число повторов каждого замера.')
+    return parser
+
+
+def ensure_posts(total, batch_size=10_000):
+    """Догенерация публикаций до нужного количества через bulk_create."""
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post
+
+    existing = Post.objects.count()
+    if existing >= total:
+        return
+    author, _ = get_user_model().objects.get_or_create(username='bench')
+    category, _ = Category.objects.get_or_create(
+        slug='bench', defaults={'title': 'Bench', 'description': 'Bench'})
+    location, _ = Location.objects.get_or_create(name='Bench')
+    start = timezone.now() - timedelta(minutes=total)
+    print(f'Генерация публикаций: {existing} -> {total}', file=sys.stderr)
+    for offset in range(existing, total, batch_size):
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                Post(
+                    title=f'Публикация {number}',
+                    text=f'Текст публикации {number}',
+                    # Несколько публикаций на одну минуту — есть дубли
+                    # pub_date, как и в реальной ленте.
+                    pub_date=start + timedelta(minutes=number // 3),
+                    author=author,
+                    category=category,
+                    location=location,
+                    # bulk_create не вызывает сигналы, поэтому видимость
+                    # задается явно.
+                    is_visible=True,
+                )
+                for number in range(offset, min(offset + batch_size, total))
+            )
+
+
+def measure(func, repeat):
+    """Медиана и максимум времени выполнения func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def ensure_dataset(**options):
+    """Генерация данных командой generate_blog_data в пустой базе.
+
+    Непустая база используется как есть: данные с тем же зерном
+    и параметрами совпадают, поэтому их не нужно создавать заново.
+    """
+    from django.core.management import call_command
+
+    from blog.models import Post
+
+    existing = Post.objects.count()
+    if not existing:
+        print('Генерация данных...', file=sys.stderr)
+        call_command('generate_blog_data', verbosity=0, stdout=sys.stderr,
+                     **options)
+    elif existing != options['posts']:
+        print(f'В базе {existing} публикаций вместо {options["posts"]}: '
+              'результаты несравнимы с базовыми.', file=sys.stderr)
+
+
+def percentile(timings, percent):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(timings)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
@@ -1,8 +1,18 @@
 from django.contrib import admin
 
 from .models import Category, Location, Post, Comment
+from .querysets import posts_update_comment_count
 
 admin.site.register(Category)
 admin.site.register(Comment)
 admin.site.register(Location)
-admin.site.register(Post)
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    actions = ('update_comment_count',)
+
+    @admin.action(description='Пересчитать число комментариев')
+    def update_comment_count(self, request, queryset):
+        updated = posts_update_comment_count(queryset)
+        self.message_user(request, f'Обновлено публикаций: {updated}.')
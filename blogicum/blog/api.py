@@ -0,0 +1,220 @@
+"""JSON API только для чтения: публикации, категории, профили, комментарии.
+
+Записи читаются проекциями values() без создания объектов моделей,
+а в запрос попадают только поля, перечисленные в параметре fields.
+Видимость публикаций та же, что и на страницах сайта.
+"""
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, F, When
+from django.http import JsonResponse
+from django.views.generic.base import View
+
+from .cbv_mixins import ConditionalPageMixin
+from .models import Category, Comment, Post
+from .paginators import CursorPaginator, InvalidCursor
+from .querysets import post_query, posts_annotate_order, posts_visible_to
+from .views import COMMENTS_NUMBER, POSTS_NUMBER
+
+JSON_DUMPS_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+class ApiError(Exception):
+    """Ошибка запроса к API, которая возвращается клиенту в JSON."""
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+class ApiListView(ConditionalPageMixin, View):
+    """Постраничный список записей в JSON.
+
+    Поля ответа задаются словарем fields: имя поля в API — путь поля
+    в ORM или имя аннотации из annotations. Поля сортировки читаются
+    всегда, так как по ним строится курсор следующей страницы.
+    """
+
+    model = None
+    queryset = None
+    fields = {}
+    annotations = {}
+    converters = {}
+    ordering = ()
+    paginate_by = None
+
+    def get_queryset(self):
+        """Выборка из queryset или model, как в обобщенных CBV Django."""
+        if self.queryset is not None:
+            return self.queryset.all()
+        if self.model is not None:
+            return self.model._default_manager.all()
+        raise ImproperlyConfigured(
+            f'{self.__class__.__name__} is missing a QuerySet. Define '
+            f'{self.__class__.__name__}.model, '
+            f'{self.__class__.__name__}.queryset, or override '
+            f'{self.__class__.__name__}.get_queryset().'
+        )
+
+    def get_fields(self):
+        """Поля ответа из параметра fields или все поля по умолчанию."""
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(',')]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(400, f'Неизвестные поля: {", ".join(unknown)}.')
+        return names
+
+    def get_rows(self, queryset, fields):
+        paths = [self.fields[name] for name in fields]
+        annotations = {
+            path: self.annotations[path]
+            for path in paths if path in self.annotations
+        }
+        ordering_fields = [name.lstrip('-') for name in self.ordering]
+        return queryset.annotate(**annotations).values(
+            *dict.fromkeys(ordering_fields + paths))
+
+    def serialize(self, row, fields):
+        item = {}
+        for name in fields:
+            value = row[self.fields[name]]
+            if name in self.converters:
+                value = self.converters[name](value)
+            item[name] = value
+        return item
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = self.get_fields()
+            paginator = CursorPaginator(
+                self.get_rows(self.get_queryset(), fields),
+                self.paginate_by, self.ordering)
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            return self.error(ApiError(400, 'Некорректный курсор страницы.'))
+        except ApiError as error:
+            return self.error(error)
+        next_url = None
+        if page.has_next():
+            params = request.GET.copy()
+            params['cursor'] = page.next_cursor
+            next_url = request.build_absolute_uri(
+                f'{request.path}?{params.urlencode()}')
+        return JsonResponse(
+            {
+                'results': [self.serialize(row, fields) for row in page],
+                'next': next_url,
+            },
+            encoder=DjangoJSONEncoder,
+            json_dumps_params=JSON_DUMPS_PARAMS,
+        )
+
+    def error(self, error):
+        return JsonResponse({'detail': error.detail}, status=error.status,
+                            json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+class ApiPostListView(ApiListView):
+    """Публикации главной ленты."""
+
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author__username',
+        'category': 'category__slug',
+        'location': 'location_name',
+        'image': 'image',
+        'comment_count': 'comments_number',
+    }
+    annotations = {
+        # Название местоположения выводится, только если оно опубликовано
+        'location_name': Case(When(location__is_published=True,
+                                   then=F('location__name'))),
+    }
+    converters = {'image': image_url}
+    ordering = ('-pub_date', '-id')
+    paginate_by = POSTS_NUMBER
+
+    def get_page_cache_scopes(self):
+        return super().get_page_cache_scopes() + (self.get_list_scope(),)
+
+    def get_list_scope(self):
+        return 'feed'
+
+    def get_queryset(self):
+        return post_query(Post.objects)
+
+
+class ApiCategoryPostListView(ApiPostListView):
+    """Публикации опубликованной категории."""
+
+    def get_list_scope(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def page_object_exists(self):
+        return Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True).exists()
+
+    def get_queryset(self):
+        category = Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True).first()
+        if category is None:
+            raise ApiError(404, 'Категория не найдена.')
+        return post_query(category.posts)
+
+
+class ApiProfilePostListView(ApiPostListView):
+    """Публикации автора; автору видны все его публикации."""
+
+    def get_list_scope(self):
+        return f'profile:{self.kwargs["username"]}'
+
+    def page_object_exists(self):
+        return User.objects.filter(username=self.kwargs['username']).exists()
+
+    def get_queryset(self):
+        author = User.objects.filter(username=self.kwargs['username']).first()
+        if author is None:
+            raise ApiError(404, 'Пользователь не найден.')
+        if self.request.user != author:
+            return post_query(author.posts)
+        return posts_annotate_order(author.posts)
+
+
+class ApiCommentListView(ApiListView):
+    """Комментарии публикации, видимой пользователю."""
+
+    fields = {
+        'id': 'id',
+        'text': 'text',
+        'created_at': 'created_at',
+        'author': 'author__username',
+    }
+    ordering = ('created_at', 'id')
+    paginate_by = COMMENTS_NUMBER
+
+    def get_page_cache_scopes(self):
+        return super().get_page_cache_scopes() + (
+            f'post:{self.kwargs["pk"]}',)
+
+    def page_object_exists(self):
+        return posts_visible_to(Post.objects, self.request.user).filter(
+            pk=self.kwargs['pk']).exists()
+
+    def get_queryset(self):
+        posts = posts_visible_to(Post.objects, self.request.user)
+        if not posts.filter(pk=self.kwargs['pk']).exists():
+            raise ApiError(404, 'Публикация не найдена.')
+        return Comment.objects.filter(post_id=self.kwargs['pk'])
@@ -0,0 +1,99 @@
+import hashlib
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+
+
+def version_key(name):
+    # Имена содержат slug и username из URL: quote() делает ключ
+    # допустимым для любого бэкенда кэша.
+    return f'blog:version:{quote(name)}'
+
+
+def get_versions(*names):
+    """Текущие версии именованных наборов данных одним обращением к кэшу.
+
+    Версия входит в ключи кэша, поэтому ее увеличение делает
+    недействительными все записи, построенные по старым данным.
+    Версия — время последнего изменения набора в наносекундах,
+    поэтому по ней же вычисляется заголовок Last-Modified. Версия
+    хранится VERSION_CACHE_TIMEOUT секунд: после этого она считается
+    изменившейся, как и вытесненная из кэша.
+    """
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Версия неизвестна (ключ вытеснен из кэша) — считаем, что
+            # набор изменился сейчас: значение не совпадет с уже
+            # использованными.
+            now = time.time_ns()
+            cache.add(key, now, settings.VERSION_CACHE_TIMEOUT)
+            # Значение по умолчанию — для кэша, который ничего не хранит
+            # (DummyCache)
+            versions[key] = cache.get(key, now)
+    return [versions[key] for key in keys]
+
+
+def get_version(name):
+    return get_versions(name)[0]
+
+
+def bump_version(*names):
+    """Увеличение версий наборов данных после изменения записей.
+
+    Новая версия — текущее время, но не меньше прежней версии плюс один:
+    при одновременном изменении из нескольких процессов версия может
+    увеличиться один раз вместо двух, но всегда отличается от прежней.
+
+    Внутри транзакции версии увеличиваются еще раз после ее фиксации:
+    страница, построенная другим запросом по данным до фиксации,
+    остается под промежуточной версией и больше не используется.
+    """
+    set_versions(names)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: set_versions(names))
+
+
+def set_versions(names):
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    now = time.time_ns()
+    cache.set_many(
+        {key: max(now, versions.get(key, 0) + 1) for key in keys},
+        settings.VERSION_CACHE_TIMEOUT,
+    )
+
+
+def page_cache_key(request, versions):
+    """Ключ кэша страницы: адрес запроса и версии ее наборов данных."""
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{url}:' + '.'.join(map(str, versions))
+
+
+def page_exists_key(etag):
+    """Ключ отметки о том, что объект страницы с этим ETag существует."""
+    return f'blog:exists:{etag.strip(chr(34))}'
+
+
+def page_etag(request, versions):
+    """Значение ETag страницы по версиям ее наборов данных и пользователю.
+
+    Страница авторизованного пользователя отличается ссылками
+    на редактирование и формами, поэтому ETag зависит от user.pk,
+    а также от сессии и CSRF-токена: после повторного входа токен
+    в форме сохраненной браузером страницы уже недействителен.
+    """
+    user_state = '0'
+    if request.user.is_authenticated:
+        # Токен создается до рендеринга, чтобы ETag учитывал тот же
+        # токен, что попадет в формы страницы
+        get_token(request)
+        user_state = (f'{request.user.pk}:{request.session.session_key}:'
+                      f'{request.META["CSRF_COOKIE"]}')
+    return '"{}"'.format(hashlib.md5(
+        f'{user_state}:{".".join(map(str, versions))}'.encode()).hexdigest())
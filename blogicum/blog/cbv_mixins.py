@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
+from core import routing, writes
+
+from .cache import get_versions, page_cache_key, page_etag, page_exists_key
 from .forms import PostForm
 from .models import Comment, Post
-from .querysets import post_query, posts_select_related
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .querysets import (posts_search, posts_select_related, posts_visible_to,
+                        search_query)
 
 
 class CheckAuthorshipMixin:
@@ -12,13 +23,264 @@ class CheckAuthorshipMixin:
 
     Для автора публикации информация доступна для всех его постов,
     включая снятые с публикации и с датой публикации в будущем.
+    Публикация, её автор и проверка видимости загружаются одним
+    запросом, а найденный объект используется до конца запроса.
     """
 
     def get_queryset(self):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if post.author != self.request.user:
-            return post_query(Post.objects)
-        return posts_select_related(Post.objects)
+        return posts_visible_to(
+            posts_select_related(Post.objects), self.request.user)
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_post'):
+            self._post = super().get_object()
+        return self._post
+
+
+class CursorPaginationMixin:
+    """Keyset-пагинация для ListView.
+
+    Включается настройкой POSTS_CURSOR_PAGINATION для всего сайта
+    или параметром cursor в запросе. Без неё используется
+    стандартная постраничная навигация Django.
+    """
+
+    cursor_ordering = ('-pub_date', '-id')
+
+    def use_cursor_pagination(self):
+        return (settings.POSTS_CURSOR_PAGINATION
+                or 'cursor' in self.request.GET)
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, self.get_cursor_ordering())
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PostSearchMixin:
+    """Полнотекстовый поиск по публикациям ленты параметром q.
+
+    Найденные публикации упорядочиваются по релевантности bm25
+    и выводятся с keyset-пагинацией: число результатов не считается.
+    """
+
+    search_ordering = ('rank', 'id')
+
+    def get_search_query(self):
+        if not hasattr(self, '_search_query'):
+            self._search_query = search_query(self.request.GET.get('q', ''))
+        return self._search_query
+
+    def use_cursor_pagination(self):
+        return (self.get_search_query() is not None
+                or super().use_cursor_pagination())
+
+    def get_cursor_ordering(self):
+        if self.get_search_query() is not None:
+            return self.search_ordering
+        return super().get_cursor_ordering()
+
+    def paginate_queryset(self, queryset, page_size):
+        # Поиск накладывается на выборку ленты при пагинации: так он
+        # работает с любым get_queryset() представления.
+        query = self.get_search_query()
+        if query is not None:
+            queryset = posts_search(queryset, query)
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class CachedCountPaginationMixin:
+    """Постраничная навигация без COUNT(*) на каждый запрос.
+
+    Число записей берется из кэша по ключу, который задает CBV,
+    а в шаблон передается сокращенный список номеров страниц.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        return self.request.path
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cache_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        """Дополнение контекста сокращенным списком страниц."""
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None and not getattr(page, 'is_cursor', False):
+            context['page_range'] = (
+                page.paginator.get_elided_page_range(page.number))
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """Кэширование страниц для неавторизованных пользователей.
+
+    Ключ кэша включает версии наборов данных, от которых зависит
+    страница: их увеличивают обработчики сигналов при изменении
+    публикаций, комментариев, категорий и местоположений.
+    """
+
+    def get_page_cache_scopes(self):
+        # Названия категорий и местоположений выводятся на всех страницах
+        return ('categories', 'locations')
+
+    def get_page_versions(self):
+        if not hasattr(self, '_page_versions'):
+            self._page_versions = get_versions(*self.get_page_cache_scopes())
+        return self._page_versions
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.get_page_versions())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            def store(rendered_response):
+                cache.set(key, rendered_response,
+                          settings.PAGE_CACHE_TIMEOUT)
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+
+class ConditionalPageMixin(AnonymousPageCacheMixin):
+    """Ответ 304 Not Modified на повторные запросы неизменных страниц.
+
+    Валидаторы вычисляются по версиям наборов данных страницы без
+    обращения к БД, поэтому ответ 304 не выполняет ни запросов выборки,
+    ни рендеринга шаблона. Last-Modified отправляется только
+    неавторизованным пользователям: время изменения не учитывает,
+    для кого построена страница.
+
+    Перед ответом 304 проверяется, что объект страницы существует:
+    иначе If-None-Match: * или поздний If-Modified-Since получили бы
+    304 и по адресу отсутствующего объекта. Отметка о существовании
+    хранится в кэше по ETag, поэтому повторный ответ 304 не обращается
+    к БД.
+    """
+
+    def page_object_exists(self):
+        """Проверка объекта страницы; переопределяется страницами объектов."""
+        return True
+
+    def page_exists(self, etag):
+        key = page_exists_key(etag)
+        if cache.get(key):
+            return True
+        exists = self.page_object_exists()
+        if exists:
+            cache.set(key, True, settings.PAGE_CACHE_TIMEOUT)
+        return exists
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        versions = self.get_page_versions()
+        etag = page_etag(request, versions)
+        last_modified = None
+        if not request.user.is_authenticated:
+            last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if (response is not None and response.status_code == 304
+                and not self.page_exists(etag)):
+            response = None
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(page_exists_key(etag), True,
+                      settings.PAGE_CACHE_TIMEOUT)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Браузер хранит страницу, но проверяет ее актуальность при каждом
+        # обращении
+        patch_cache_control(
+            response, no_cache=True, private=request.user.is_authenticated)
+        return response
+
+
+class ReplicaReadMixin:
+    """Чтение данных страницы из реплики БД (настройка READ_REPLICA).
+
+    Шаблон рендерится здесь же, пока запросы направляются в реплику.
+    После своей записи пользователь читает из основной БД, как и все
+    пользователи страницы, версии данных которой (AnonymousPageCacheMixin)
+    недавно увеличились.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        changed = max(self.get_page_versions())
+        with routing.read_from_replica(request, changed):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+
+class WriteQueueMixin:
+    """Запись формы и удаление объекта через очередь записи core.writes.
+
+    Если очередь включена настройкой SQLITE_WRITE_QUEUE, в поток записи
+    передаются только form.save() и delete(): разбор запроса, проверка
+    формы, обработка изображений и сохранение файлов выполняются
+    в потоке запроса и не задерживают группу записей. Запись идет
+    в основную БД, и следующие страницы пользователь читает из нее,
+    пока реплика не получит изменения.
+    """
+
+    def run_write(self, func):
+        result = writes.run(func)
+        routing.remember_write(self.request)
+        return result
+
+    def form_valid(self, form):
+        # Файлы сохраняются в хранилище до записи в БД, как это
+        # сделал бы FileField.pre_save внутри form.save()
+        for field in form.instance._meta.concrete_fields:
+            file = getattr(form.instance, field.attname)
+            if isinstance(file, FieldFile) and file and not file._committed:
+                file.save(file.name, file.file, save=False)
+        save = form.save
+        form.save = lambda *args, **kwargs: self.run_write(
+            lambda: save(*args, **kwargs))
+        return super().form_valid(form)
+
+    def delete(self, request, *args, **kwargs):
+        """Удаление объекта, как в DeletionMixin.delete, через очередь."""
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        self.run_write(self.object.delete)
+        return HttpResponseRedirect(success_url)
 
 
 class RedirectProfileMixin:
@@ -29,7 +291,7 @@ class RedirectProfileMixin:
                        kwargs={'username': self.request.user.username})
 
 
-class PostUpdateDeleteViewMixin(UserPassesTestMixin):
+class PostUpdateDeleteViewMixin(WriteQueueMixin, UserPassesTestMixin):
     """Общие инструкции для CBV редактирования и удаления публикации."""
 
     model = Post
@@ -39,14 +301,14 @@ class PostUpdateDeleteViewMixin(UserPassesTestMixin):
     def test_func(self):
         """Проверка соответствия пользователя автору поста."""
         self.object = self.get_object(Post.objects.all())
-        return self.request.user == self.object.author
+        return self.request.user.pk == self.object.author_id
 
     def handle_no_permission(self):
         """Переход в случае провала проверки UserPassesTestMixin.test_func."""
         return redirect('blog:post_detail', self.object.pk)
 
 
-class CommentUpdateDeleteMixin(UserPassesTestMixin):
+class CommentUpdateDeleteMixin(WriteQueueMixin, UserPassesTestMixin):
     """Общие инструкции для CBV редактирования и удаления комментария."""
 
     model = Comment
@@ -56,7 +318,7 @@ class CommentUpdateDeleteMixin(UserPassesTestMixin):
     def test_func(self):
         """Проверка соответствия пользователя автору комментария."""
         self.object = self.get_object()
-        return self.request.user == self.object.author
+        return self.request.user.pk == self.object.author_id
 
     def get_success_url(self):
         """Возврат на страницу публикации."""
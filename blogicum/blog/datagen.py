@@ -0,0 +1,140 @@
+"""Генерация синтетических данных блога для замеров производительности.
+
+Функции модуля не обращаются к БД и возвращают значения полей простыми
+кортежами, поэтому их можно выполнять в пуле процессов. Каждая пачка
+строк генерируется собственным генератором случайных чисел, зерно
+которого зависит от общего зерна, вида данных и номера первой строки:
+результат не зависит от числа процессов и порядка их выполнения.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+DAY = 24 * 60 * 60
+
+WORDS = (
+    'город', 'утро', 'кофе', 'прогулка', 'река', 'парк', 'дождь', 'солнце',
+    'книга', 'поезд', 'море', 'горы', 'работа', 'отпуск', 'друзья', 'кошка',
+    'собака', 'велосипед', 'музей', 'концерт', 'ужин', 'рецепт', 'сад',
+    'снег', 'лето', 'осень', 'зима', 'весна', 'дорога', 'мост', 'вечер',
+    'новости', 'история', 'фотография', 'путешествие', 'здоровье', 'спорт',
+    'кино', 'театр', 'школа', 'проект', 'идея', 'планы', 'выходные',
+    'сегодня', 'вчера', 'наконец', 'очень', 'немного', 'снова', 'вместе',
+    'интересный', 'тихий', 'шумный', 'долгий', 'быстрый', 'новый', 'старый',
+)
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Петр', 'Ольга', 'Сергей', 'Елена',
+               'Алексей', 'Наталья', 'Дмитрий')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев',
+              'Петров', 'Соколов', 'Михайлов', 'Новиков', 'Федоров')
+
+
+def batch_random(seed, kind, start):
+    return random.Random(f'{seed}:{kind}:{start}')
+
+
+def words(rnd, low, high):
+    return ' '.join(rnd.choices(WORDS, k=rnd.randint(low, high)))
+
+
+def to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def make_users(task):
+    """Пользователи: (имя, фамилия, дата регистрации)."""
+    seed, start, stop, params = task
+    rnd = batch_random(seed, 'users', start)
+    return [
+        (
+            rnd.choice(FIRST_NAMES),
+            rnd.choice(LAST_NAMES),
+            params['now'] - rnd.uniform(0, params['days'] * DAY),
+        )
+        for _ in range(start, stop)
+    ]
+
+
+def make_posts(task):
+    """Публикации: (заголовок, текст, время публикации, опубликована,
+    номер автора, номер категории, номер местоположения или None).
+
+    Публикаций становится больше ближе к текущей дате; небольшая доля
+    снята с публикации или отложена на будущее. Номера авторов
+    распределены неравномерно: немногие авторы пишут большую часть.
+    """
+    seed, start, stop, params = task
+    rnd = batch_random(seed, 'posts', start)
+    now = params['now']
+    period = params['days'] * DAY
+    rows = []
+    for _ in range(start, stop):
+        if rnd.random() < params['future']:
+            pub_ts = now + rnd.uniform(60 * 60, 30 * DAY)
+        else:
+            # Треугольное распределение с вершиной в текущей дате
+            pub_ts = now - period + rnd.triangular(0, period, period)
+        location = (
+            int(rnd.random() * params['locations'])
+            if rnd.random() < 0.7 else None
+        )
+        rows.append((
+            words(rnd, 2, 8).capitalize(),
+            words(rnd, 10, params['text_words']).capitalize() + '.',
+            pub_ts,
+            rnd.random() >= params['unpublished'],
+            int(params['users'] * rnd.random() ** 2),
+            int(params['categories'] * rnd.random() ** 1.5),
+            location,
+        ))
+    return rows
+
+
+def make_comments(task):
+    """Комментарии: (номер публикации, номер автора, текст, задержка).
+
+    Если задан номер публикации, все комментарии пачки относятся к ней,
+    иначе публикации выбираются с сильным перекосом к первым номерам.
+    Задержка — время в секундах от публикации до комментария.
+    """
+    seed, start, stop, params = task
+    rnd = batch_random(seed, f'comments:{params.get("post")}', start)
+    rows = []
+    for _ in range(start, stop):
+        post = params.get('post')
+        if post is None:
+            post = int(params['posts'] * rnd.random() ** params['skew'])
+        rows.append((
+            post,
+            int(params['users'] * rnd.random()),
+            words(rnd, 3, 30).capitalize() + '.',
+            rnd.expovariate(1 / (2 * DAY)),
+        ))
+    return rows
+
+
+def tasks(seed, total, batch_size, params):
+    return [
+        (seed, start, min(start + batch_size, total), params)
+        for start in range(0, total, batch_size)
+    ]
+
+
+def generate(func, task_list, workers):
+    """Пачки строк по порядку, при workers > 1 — из пула процессов.
+
+    В пуле одновременно выполняется не больше 2 * workers пачек, чтобы
+    готовые строки не копились в памяти быстрее, чем их вставляют в БД.
+    """
+    if workers <= 1:
+        yield from map(func, task_list)
+        return
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, task) for task in task_list[:window]]
+        for index in range(len(task_list)):
+            rows = futures[index].result()
+            futures[index] = None
+            if index + window < len(task_list):
+                futures.append(
+                    executor.submit(func, task_list[index + window]))
+            yield rows
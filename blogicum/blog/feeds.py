@@ -0,0 +1,259 @@
+"""Ленты публикаций в форматах Atom и JSON Feed для агрегаторов.
+
+Лента пишется по мере чтения публикаций из БД, а готовый текст
+сохраняется в кэше с ключом из версий наборов данных ленты. Повторный
+запрос агрегатора получает 304 или текст из кэша без обращения к БД,
+если объект ленты (категория, автор) уже проверен для этой версии.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.generic.base import View
+
+from .cache import get_versions, page_exists_key
+from .models import Category, Post
+from .querysets import post_query
+
+# Число публикаций в ленте
+FEED_SIZE = 20
+CONTENT_TYPES = {
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+
+def flush(buffer):
+    """Содержимое буфера с его последующей очисткой."""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+class StreamingAtom1Feed(Atom1Feed):
+    """Лента Atom, которая пишется по одной записи, а не целиком.
+
+    Записи не накапливаются в self.items, поэтому время обновления
+    ленты передается явно, а не вычисляется по записям.
+    """
+
+    def __init__(self, *args, updated, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated = updated
+
+    def latest_post_date(self):
+        return self.updated
+
+    def stream(self, items):
+        """Текст ленты частями: заголовок, затем по одной записи."""
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8',
+                                      short_empty_elements=True)
+        handler.startDocument()
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+        yield flush(buffer)
+        for item in items:
+            # add_item() приводит поля записи к виду, который ожидает
+            # add_item_elements().
+            self.add_item(**item)
+            item = self.items.pop()
+            handler.startElement('entry', self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement('entry')
+            yield flush(buffer)
+        handler.endElement('feed')
+        yield flush(buffer)
+
+
+class PostFeedView(View):
+    """Лента последних публикаций главной страницы."""
+
+    title = 'Блогикум'
+
+    def get_scopes(self):
+        return ('categories', 'locations', self.get_list_scope())
+
+    def get_list_scope(self):
+        return 'feed'
+
+    def get_posts(self):
+        return post_query(Post.objects)
+
+    def get_title(self):
+        return self.title
+
+    def get_link(self):
+        return reverse('blog:index')
+
+    def get(self, request, *args, feed_format, **kwargs):
+        if feed_format not in CONTENT_TYPES:
+            raise Http404
+        # Ключи и ETag не зависят от пользователя: лента строится
+        # только из общедоступных публикаций.
+        versions = get_versions(*self.get_scopes())
+        signature = f'{request.build_absolute_uri()}:{versions}'
+        digest = hashlib.md5(signature.encode()).hexdigest()
+        etag = f'"{digest}"'
+        self.last_modified = last_modified = max(versions) // 10 ** 9
+        self.check_object(etag)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.feed_response(feed_format, f'blog:feed:{digest}')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def feed_response(self, feed_format, key):
+        content_type = CONTENT_TYPES[feed_format]
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, content_type=content_type)
+        if not self.object_loaded:
+            self.load_object()
+        posts = (
+            self.get_posts().order_by('-pub_date', '-id')[:FEED_SIZE]
+            .iterator(chunk_size=FEED_SIZE)
+        )
+        writer = self.write_atom if feed_format == 'atom' else self.write_json
+        return StreamingHttpResponse(
+            self.cache_chunks(key, writer(posts)), content_type=content_type)
+
+    def load_object(self):
+        """Загрузка объекта ленты перед ее построением."""
+
+    def check_object(self, etag):
+        """Проверка объекта ленты до ответа 304 и текста из кэша.
+
+        Как и у страниц (ConditionalPageMixin), отметка о существовании
+        объекта хранится в кэше по ETag: повторный запрос не обращается
+        к БД.
+        """
+        self.object_loaded = False
+        key = page_exists_key(etag)
+        if not cache.get(key):
+            self.load_object()
+            self.object_loaded = True
+            cache.set(key, True, settings.PAGE_CACHE_TIMEOUT)
+
+    def cache_chunks(self, key, chunks):
+        """Передача частей ленты клиенту и сохранение ее текста в кэш."""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        cache.set(key, ''.join(parts), settings.PAGE_CACHE_TIMEOUT)
+
+    def absolute_url(self, path):
+        return self.request.build_absolute_uri(path)
+
+    def post_url(self, post):
+        return self.absolute_url(reverse('blog:post_detail', args=(post.pk,)))
+
+    def write_atom(self, posts):
+        """Лента Atom с временем обновления по версиям ее данных."""
+        feed = StreamingAtom1Feed(
+            title=self.get_title(),
+            link=self.absolute_url(self.get_link()),
+            description='',
+            feed_url=self.absolute_url(self.request.path),
+            language='ru',
+            updated=datetime.fromtimestamp(self.last_modified, timezone.utc),
+        )
+        return feed.stream(
+            {
+                'title': post.title,
+                'link': self.post_url(post),
+                'description': post.text,
+                'unique_id': self.post_url(post),
+                'pubdate': post.pub_date,
+                'author_name': post.author.username,
+                'categories': (
+                    (post.category.title,) if post.category else ()),
+            }
+            for post in posts
+        )
+
+    def write_json(self, posts):
+        """Лента JSON Feed 1.1: заголовок, затем элементы через запятую."""
+        header = json.dumps({
+            'version': JSON_FEED_VERSION,
+            'title': self.get_title(),
+            'home_page_url': self.absolute_url(self.get_link()),
+            'feed_url': self.absolute_url(self.request.path),
+            'language': 'ru',
+        }, ensure_ascii=False)
+        yield header[:-1] + ', "items": ['
+        separator = ''
+        for post in posts:
+            post_link = self.post_url(post)
+            item = {
+                'id': post_link,
+                'url': post_link,
+                'title': post.title,
+                'content_text': post.text,
+                'date_published': post.pub_date.isoformat(),
+                'authors': [{'name': post.author.username}],
+            }
+            if post.category:
+                item['tags'] = [post.category.title]
+            if post.image:
+                item['image'] = self.absolute_url(post.image.url)
+            yield separator + json.dumps(item, ensure_ascii=False)
+            separator = ', '
+        yield ']}'
+
+
+class CategoryFeedView(PostFeedView):
+    """Лента публикаций категории."""
+
+    def get_list_scope(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def load_object(self):
+        self.category = get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True)
+
+    def get_posts(self):
+        return post_query(self.category.posts)
+
+    def get_title(self):
+        return f'{self.title}: {self.category.title}'
+
+    def get_link(self):
+        return reverse('blog:category_posts', args=(self.category.slug,))
+
+
+class ProfileFeedView(PostFeedView):
+    """Лента публикаций автора."""
+
+    def get_list_scope(self):
+        return f'profile:{self.kwargs["username"]}'
+
+    def load_object(self):
+        self.author = get_object_or_404(
+            User, username=self.kwargs['username'])
+
+    def get_posts(self):
+        return post_query(self.author.posts)
+
+    def get_title(self):
+        return f'{self.title}: @{self.author.username}'
+
+    def get_link(self):
+        return reverse('blog:profile', args=(self.author.username,))
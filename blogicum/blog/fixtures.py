@@ -0,0 +1,122 @@
+"""Потоковое чтение и запись данных блога в формате фикстур Django.
+
+Формат записей совпадает с dumpdata/loaddata: {"model", "pk", "fields"}.
+Файл .json — массив записей, .jsonl — по одной записи на строку.
+Файлы читаются и пишутся частями, не загружаясь в память целиком.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Модели в порядке зависимостей: связанные записи идут раньше ссылающихся
+MODELS = {
+    'auth.user': User,
+    'blog.category': Category,
+    'blog.location': Location,
+    'blog.post': Post,
+    'blog.comment': Comment,
+}
+# Поля, которые вычисляются по другим данным и не переносятся
+DERIVED_FIELDS = {
+    'blog.post': ('comment_count', 'is_visible'),
+}
+READ_SIZE = 64 * 1024
+
+
+def iter_json(file):
+    """Записи JSON-массива по одной, без чтения файла целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Пропуск пробелов и разделителей массива
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            if buffer[position] == '[':
+                started = True
+            position += 1
+        if position < len(buffer):
+            if not started:
+                raise ValueError('Файл должен содержать JSON-массив записей.')
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield record
+                continue
+        if eof:
+            return
+        chunk = file.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iter_jsonl(file):
+    """Записи файла JSON Lines по одной."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(file, fmt):
+    return iter_jsonl(file) if fmt == 'jsonl' else iter_json(file)
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if str(path).endswith('.jsonl') else 'json'
+
+
+@contextmanager
+def preserve_auto_now_add(*models):
+    """Сохранение дат создания из файла при bulk_create.
+
+    bulk_create заполняет поля auto_now_add текущим временем, поэтому
+    на время загрузки это поведение отключается.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Progress:
+    """Вывод числа обработанных записей и скорости обработки."""
+
+    def __init__(self, stdout, every):
+        self.stdout = stdout
+        self.every = every
+        self.count = 0
+        self.started = time.monotonic()
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.count / elapsed if elapsed else 0
+
+    def add(self, number=1):
+        before = self.count // self.every
+        self.count += number
+        if self.count // self.every > before:
+            self.report()
+
+    def report(self):
+        self.stdout.write(
+            f'Обработано записей: {self.count} ({self.rate():.0f} в секунду)')
@@ -1,5 +1,9 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from core import metrics
+
+from .images import process_post_image
 from .models import Post, Comment
 
 
@@ -13,6 +17,15 @@ class PostForm(forms.ModelForm):
             attrs={'type': 'datetime-local'}
         )}
 
+    def clean_image(self):
+        """Уменьшение и перекодирование нового изображения."""
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            metrics.observe('blogicum_image_upload_bytes', image.size,
+                            metrics.SIZE_BUCKETS)
+            return process_post_image(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     """Форма для комментария, привязанная к модели."""
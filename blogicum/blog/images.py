@@ -0,0 +1,210 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files import File
+from django.utils._os import safe_join
+from PIL import Image, ImageOps
+
+# Расширения файлов для поддерживаемых форматов сохранения
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+CONTENT_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp'}
+# Имя файла из content_name(); суффикс добавляет хранилище при повторной
+# загрузке того же содержимого
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{20}(_[0-9A-Za-z]{7})?\.\w+$')
+
+
+def open_image(file, max_size):
+    """Открытие изображения с уменьшенным декодированием JPEG.
+
+    draft() позволяет декодировать JPEG сразу в уменьшенном масштабе
+    (1/2, 1/4, 1/8), не разворачивая в памяти полный кадр с камеры.
+    """
+    file.seek(0)
+    try:
+        image = Image.open(file)
+        image.draft('RGB', max_size)
+        image.load()
+    except Image.DecompressionBombError:
+        raise ValidationError('Слишком большое разрешение изображения.')
+    except OSError:
+        raise ValidationError('Не удалось прочитать изображение.')
+    return image
+
+
+def save_image(image, image_format, quality):
+    """Кодирование изображения во временный файл.
+
+    Метаданные исходного файла (EXIF, в том числе геопозиция)
+    не передаются в save(), поэтому в результат не попадают.
+    Большой результат сбрасывается из памяти на диск.
+    """
+    if image_format == 'JPEG':
+        if image.mode != 'RGB':
+            image = flatten(image)
+        options = {'progressive': True, 'optimize': True}
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        options = {'method': 4}
+    output = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    image.save(output, image_format, quality=quality, **options)
+    output.seek(0)
+    return output
+
+
+def flatten(image):
+    """Перевод в RGB с заливкой прозрачных участков белым цветом."""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def content_name(file, extension):
+    """Имя файла по хэшу содержимого: одинаковые файлы — одно имя."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return f'{digest.hexdigest()[:20]}.{extension}'
+
+
+def process_post_image(uploaded_file):
+    """Подготовка загруженного изображения публикации к хранению.
+
+    Проверяет размер файла, поворачивает кадр по EXIF-ориентации,
+    уменьшает до POST_IMAGE_MAX_SIZE и перекодирует в POST_IMAGE_FORMAT
+    с качеством POST_IMAGE_QUALITY без метаданных.
+    """
+    if uploaded_file.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+        limit = settings.POST_IMAGE_MAX_UPLOAD_SIZE // (1024 * 1024)
+        raise ValidationError(
+            f'Размер изображения не должен превышать {limit} МБ.')
+    max_size = settings.POST_IMAGE_MAX_SIZE
+    image_format = settings.POST_IMAGE_FORMAT
+    with open_image(uploaded_file, max_size) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        output = save_image(image, image_format, settings.POST_IMAGE_QUALITY)
+    return File(output, name=content_name(output, EXTENSIONS[image_format]))
+
+
+def variant_etag(name, size):
+    """Строгий ETag уменьшенной копии изображения name.
+
+    Копия однозначно определяется исходным файлом (путь, размер, время
+    изменения), запрошенным размером и параметрами кодирования, поэтому
+    их хэш служит и ETag, и именем файла в дисковом кэше.
+    Возвращает None, если исходного файла нет.
+    """
+    try:
+        stat = os.stat(safe_join(settings.MEDIA_ROOT, name))
+    except (OSError, SuspiciousFileOperation):
+        return None
+    signature = (
+        f'{name}:{stat.st_size}:{stat.st_mtime_ns}:{size[0]}x{size[1]}:'
+        f'{settings.POST_IMAGE_FORMAT}:{settings.POST_IMAGE_QUALITY}'
+    )
+    return hashlib.sha256(signature.encode()).hexdigest()[:32]
+
+
+def open_image_variant(name, size):
+    """Открытие уменьшенной копии изображения из дискового кэша.
+
+    Отсутствующая копия создается и сохраняется в IMAGE_VARIANT_ROOT.
+    Время изменения файла копии обновляется при каждом обращении,
+    по нему evict_image_variants() удаляет давно не запрошенные копии.
+    """
+    etag = variant_etag(name, size)
+    if etag is None:
+        raise FileNotFoundError(name)
+    extension = EXTENSIONS[settings.POST_IMAGE_FORMAT]
+    path = Path(settings.IMAGE_VARIANT_ROOT) / etag[:2] / f'{etag}.{extension}'
+    try:
+        os.utime(path)
+        return open(path, 'rb')
+    except FileNotFoundError:
+        make_image_variant(
+            safe_join(settings.MEDIA_ROOT, name), size, path)
+    cache_size.add(path)
+    return open(path, 'rb')
+
+
+def make_image_variant(source, size, path):
+    """Создание копии: запись во временный файл и атомарная подмена."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(source, 'rb') as file, open_image(file, size) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        output = save_image(
+            image, settings.POST_IMAGE_FORMAT, settings.POST_IMAGE_QUALITY)
+    with output, NamedTemporaryFile(
+            dir=path.parent, suffix='.tmp', delete=False) as tmp:
+        shutil.copyfileobj(output, tmp)
+    os.replace(tmp.name, path)
+
+
+class VariantCacheSize:
+    """Объем дискового кэша копий, который процесс ведет сам.
+
+    Каталог кэша обходится только при превышении лимита и не чаще
+    раза в IMAGE_VARIANT_RESCAN_INTERVAL секунд для учета копий,
+    созданных другими процессами; в остальное время к объему
+    прибавляется размер каждой созданной копии.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = None
+        self.scanned_at = 0
+
+    def add(self, path):
+        with self.lock:
+            if (self.total is None or time.monotonic() - self.scanned_at
+                    > settings.IMAGE_VARIANT_RESCAN_INTERVAL):
+                self.total = evict_image_variants(keep=path)
+                self.scanned_at = time.monotonic()
+                return
+            self.total += path.stat().st_size
+            if self.total > settings.IMAGE_VARIANT_CACHE_MAX_SIZE:
+                self.total = evict_image_variants(keep=path)
+                self.scanned_at = time.monotonic()
+
+
+cache_size = VariantCacheSize()
+
+
+def evict_image_variants(keep=None):
+    """Удаление давно не запрошенных копий сверх лимита объема кэша.
+
+    Копия keep, только что созданная для текущего запроса, не удаляется,
+    но учитывается в объеме. Возвращает объем кэша после удаления.
+    """
+    files = []
+    total = 0
+    for path in Path(settings.IMAGE_VARIANT_ROOT).glob('*/*'):
+        if path.suffix == '.tmp':
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        total += stat.st_size
+        if path != keep:
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+    files.sort()
+    for _, file_size, path in files:
+        if total <= settings.IMAGE_VARIANT_CACHE_MAX_SIZE:
+            break
+        path.unlink(missing_ok=True)
+        total -= file_size
+    return total
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.images import evict_image_variants
+
+
+class Command(BaseCommand):
+    help = ('Удаление давно не запрошенных уменьшенных копий изображений '
+            'сверх IMAGE_VARIANT_CACHE_MAX_SIZE (для cron).')
+
+    def handle(self, *args, **options):
+        total = evict_image_variants()
+        self.stdout.write(
+            f'Объем кэша копий: {total // 1024} КиБ из '
+            f'{settings.IMAGE_VARIANT_CACHE_MAX_SIZE // 1024} КиБ.')
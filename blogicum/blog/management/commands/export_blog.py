@@ -0,0 +1,76 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog.fixtures import DERIVED_FIELDS, MODELS, Progress, detect_format
+
+
+class Command(BaseCommand):
+    help = ('Потоковая выгрузка пользователей, категорий, местоположений, '
+            'публикаций и комментариев в файл JSON или JSONL '
+            'в формате фикстур Django.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            help='Путь к файлу; без него данные выводятся в stdout.'
+        )
+        parser.add_argument(
+            '--format', choices=('json', 'jsonl'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2_000,
+            help='Число записей, читаемых из БД за один запрос.'
+        )
+        parser.add_argument(
+            '--progress', type=int, default=100_000,
+            help='Выводить прогресс через указанное число записей.'
+        )
+
+    def handle(self, *args, path, format, chunk_size, progress, **options):
+        fmt = detect_format(path or '', format)
+        # Прогресс пишется в stderr, чтобы не смешиваться с данными
+        self.progress = Progress(self.stderr, progress)
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        if path:
+            with open(path, 'w', encoding='utf-8') as file:
+                self.write(file, fmt, encoder, chunk_size)
+        else:
+            self.write(sys.stdout, fmt, encoder, chunk_size)
+        self.progress.report()
+
+    def write(self, file, fmt, encoder, chunk_size):
+        if fmt == 'jsonl':
+            for record in self.iter_records(chunk_size):
+                file.write(encoder.encode(record) + '\n')
+                self.progress.add()
+            return
+        file.write('[')
+        separator = '\n'
+        for record in self.iter_records(chunk_size):
+            file.write(separator + encoder.encode(record))
+            separator = ',\n'
+            self.progress.add()
+        file.write('\n]\n')
+
+    def iter_records(self, chunk_size):
+        for label, model in MODELS.items():
+            derived = DERIVED_FIELDS.get(label, ())
+            # Внешние ключи читаются по attname, а в файл пишутся по имени
+            fields = {
+                field.attname: field.name
+                for field in model._meta.concrete_fields
+                if not field.primary_key and field.name not in derived
+            }
+            rows = model.objects.order_by('pk').values(
+                'pk', *fields).iterator(chunk_size=chunk_size)
+            for row in rows:
+                yield {
+                    'model': label,
+                    'pk': row['pk'],
+                    'fields': {
+                        name: row[attname] for attname, name in fields.items()
+                    },
+                }
@@ -0,0 +1,240 @@
+import itertools
+import random
+import time
+from array import array
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from blog import datagen
+from blog.fixtures import Progress, preserve_auto_now_add
+from blog.models import Category, Comment, Location, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Генерация синтетических пользователей, категорий, '
+            'местоположений, публикаций и комментариев для замеров.')
+
+    def add_arguments(self, parser):
+        counts = (
+            ('--users', 1_000, 'Число пользователей.'),
+            ('--categories', 20, 'Число категорий.'),
+            ('--locations', 50, 'Число местоположений.'),
+            ('--posts', 100_000, 'Число публикаций.'),
+            ('--comments', 1_000_000,
+             'Число комментариев, распределенных по публикациям.'),
+            ('--viral', 3, 'Число популярных публикаций.'),
+            ('--viral-comments', 100_000,
+             'Дополнительные комментарии каждой популярной публикации.'),
+        )
+        for option, default, help_text in counts:
+            parser.add_argument(option, type=int, default=default,
+                                help=help_text)
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='Период в днях, за который распределены публикации.'
+        )
+        parser.add_argument(
+            '--unpublished', type=float, default=0.05,
+            help='Доля публикаций, снятых с публикации.'
+        )
+        parser.add_argument(
+            '--future', type=float, default=0.02,
+            help='Доля отложенных публикаций.'
+        )
+        parser.add_argument(
+            '--text-words', type=int, default=150,
+            help='Наибольшее число слов в тексте публикации.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно дает одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5_000,
+            help='Число записей, вставляемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов, генерирующих строки.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['users'] or not options['categories']:
+            raise CommandError('Нужен хотя бы один пользователь и категория.')
+        if options['viral'] > options['posts']:
+            raise CommandError('Популярных публикаций больше, чем публикаций.')
+        self.options = options
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.progress = Progress(self.stdout, 100_000)
+        self.now = time.time()
+        self.first_pk = {
+            model: (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+            for model in (User, Category, Location, Post, Comment)
+        }
+        self.username_prefix = self.free_prefix(User, 'username', 'user')
+        self.slug_prefix = self.free_prefix(Category, 'slug', 'category-')
+        self.params = {
+            'now': self.now,
+            'days': options['days'],
+            'users': options['users'],
+            'categories': options['categories'],
+            'locations': options['locations'],
+            'posts': options['posts'],
+            'unpublished': options['unpublished'],
+            'future': options['future'],
+            'text_words': options['text_words'],
+            'skew': 3,
+        }
+        with preserve_auto_now_add(Category, Location, Post, Comment):
+            self.create_users()
+            self.create_categories()
+            self.create_posts()
+            self.create_comments()
+        self.progress.report()
+
+        # bulk_create не вызывает сигналы: производные данные
+        # и кэш пересчитываются после загрузки. Поисковый индекс
+        # обновляют триггеры БД при вставке.
+        verbosity = options['verbosity']
+        call_command('rebuild_comment_count', verbosity=verbosity,
+                     stdout=self.stdout)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано записей: {self.progress.count}.'))
+
+    @staticmethod
+    def free_prefix(model, field, base):
+        """Префикс, с которого не начинается ни одно значение поля.
+
+        Уникальные имена и slug создаются из префикса и ключа: с таким
+        префиксом они не совпадут с уже существующими, например
+        с именами зарегистрированных пользователей.
+        """
+        prefix = base
+        for number in itertools.count(2):
+            if not model.objects.filter(
+                    **{f'{field}__startswith': prefix}).exists():
+                return prefix
+            prefix = f'{base.rstrip("-")}-run{number}-'
+
+    def insert(self, model, objs):
+        with transaction.atomic():
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.progress.add(len(objs))
+
+    def generate(self, func, total, **params):
+        return datagen.generate(
+            func,
+            datagen.tasks(self.seed, total, self.batch_size,
+                          {**self.params, **params}),
+            self.options['workers'],
+        )
+
+    def create_users(self):
+        pk = self.first_pk[User]
+        for rows in self.generate(datagen.make_users, self.params['users']):
+            objs = []
+            for first_name, last_name, joined in rows:
+                username = f'{self.username_prefix}{pk}'
+                objs.append(User(
+                    pk=pk, username=username, email=f'{username}@example.com',
+                    first_name=first_name, last_name=last_name,
+                    # Неиспользуемый пароль: вход под этими пользователями
+                    # невозможен.
+                    password='!', date_joined=datagen.to_datetime(joined),
+                ))
+                pk += 1
+            self.insert(User, objs)
+
+    def create_categories(self):
+        rnd = random.Random(f'{self.seed}:categories')
+        created_at = datagen.to_datetime(
+            self.now - self.params['days'] * datagen.DAY)
+        first = self.first_pk[Category]
+        categories = [
+            Category(
+                pk=pk, slug=f'{self.slug_prefix}{pk}', created_at=created_at,
+                title=datagen.words(rnd, 1, 3).capitalize(),
+                description=datagen.words(rnd, 10, 30).capitalize() + '.',
+                is_published=rnd.random() >= 0.1,
+            )
+            for pk in range(first, first + self.params['categories'])
+        ]
+        self.published_categories = {
+            category.pk for category in categories if category.is_published}
+        first = self.first_pk[Location]
+        locations = [
+            Location(pk=pk, name=datagen.words(rnd, 1, 2).capitalize(),
+                     created_at=created_at,
+                     is_published=rnd.random() >= 0.1)
+            for pk in range(first, first + self.params['locations'])
+        ]
+        self.insert(Category, categories)
+        self.insert(Location, locations)
+
+    def create_posts(self):
+        # Время публикации и видимость нужны для комментариев
+        self.pub_times = array('d')
+        self.visible = bytearray()
+        pk = self.first_pk[Post]
+        for rows in self.generate(datagen.make_posts, self.params['posts']):
+            objs = []
+            for (title, text, pub_ts, is_published,
+                 author, category, location) in rows:
+                category_id = self.first_pk[Category] + category
+                pub_date = datagen.to_datetime(pub_ts)
+                is_visible = (is_published and pub_ts <= self.now
+                              and category_id in self.published_categories)
+                objs.append(Post(
+                    pk=pk, title=title, text=text, pub_date=pub_date,
+                    created_at=datagen.to_datetime(min(pub_ts, self.now)),
+                    is_published=is_published, is_visible=is_visible,
+                    author_id=self.first_pk[User] + author,
+                    category_id=category_id,
+                    location_id=(None if location is None
+                                 else self.first_pk[Location] + location),
+                ))
+                self.pub_times.append(pub_ts)
+                self.visible.append(is_visible)
+                pk += 1
+            self.insert(Post, objs)
+
+    def viral_posts(self):
+        """Номера популярных публикаций среди видимых читателям."""
+        rnd = random.Random(f'{self.seed}:viral')
+        total = self.params['posts']
+        visible = sum(self.visible)
+        wanted = min(self.options['viral'], visible)
+        chosen = set()
+        while len(chosen) < wanted:
+            index = rnd.randrange(total)
+            if self.visible[index]:
+                chosen.add(index)
+        return sorted(chosen)
+
+    def create_comments(self):
+        if not self.params['posts']:
+            return
+        batches = [self.generate(datagen.make_comments,
+                                 self.options['comments'])]
+        for post in self.viral_posts():
+            batches.append(self.generate(
+                datagen.make_comments, self.options['viral_comments'],
+                post=post))
+        for generator in batches:
+            for rows in generator:
+                self.insert(Comment, [
+                    Comment(
+                        post_id=self.first_pk[Post] + post,
+                        author_id=self.first_pk[User] + author,
+                        text=text,
+                        created_at=datagen.to_datetime(
+                            min(self.pub_times[post] + delay, self.now)),
+                    )
+                    for post, author, text, delay in rows
+                ])
@@ -0,0 +1,175 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.fixtures import (DERIVED_FIELDS, MODELS, Progress, detect_format,
+                           iter_records, preserve_auto_now_add)
+from blog.models import Category, User
+
+
+class Command(BaseCommand):
+    help = ('Потоковая загрузка пользователей, категорий, местоположений, '
+            'публикаций и комментариев из файла JSON или JSONL '
+            'в формате фикстур Django.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с данными.')
+        parser.add_argument(
+            '--format', choices=('json', 'jsonl'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5_000,
+            help='Число записей, вставляемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--progress', type=int, default=100_000,
+            help='Выводить прогресс через указанное число записей.'
+        )
+
+    def handle(self, *args, path, format, batch_size, progress, **options):
+        self.batch_size = batch_size
+        self.progress = Progress(self.stdout, progress)
+        # Соответствие первичных ключей из файла ключам в БД
+        self.id_maps = {label: {} for label in MODELS}
+        self.next_pk = {
+            label: (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+            for label, model in MODELS.items()
+        }
+        self.buffers = {label: [] for label in MODELS}
+        self.skipped = 0
+        self.usernames = dict(User.objects.values_list('username', 'pk'))
+        self.slugs = dict(Category.objects.values_list('slug', 'pk'))
+        self.published_categories = set(
+            Category.objects.filter(is_published=True)
+            .values_list('pk', flat=True))
+        self.now = timezone.now()
+
+        fmt = detect_format(path, format)
+        with preserve_auto_now_add(*MODELS.values()):
+            try:
+                deferred = self.read(path, fmt)
+                # Записи, связанные с записями дальше по файлу, не хранятся
+                # в памяти: файл перечитывается для каждой такой модели
+                # в порядке зависимостей, когда связанные записи загружены
+                for label in MODELS:
+                    if label in deferred:
+                        self.flush()
+                        self.read(path, fmt, label)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Не удалось прочитать {path}: {error}')
+            self.flush()
+        self.progress.report()
+        if self.skipped:
+            self.stderr.write(
+                f'Пропущено записей без связанных данных: {self.skipped}.')
+
+        # bulk_create не вызывает сигналы: производные данные
+        # и кэш пересчитываются после загрузки. Поисковый индекс
+        # обновляют триггеры БД при вставке.
+        verbosity = options['verbosity']
+        call_command('rebuild_comment_count', verbosity=verbosity,
+                     stdout=self.stdout)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {self.progress.count}.'))
+
+    def read(self, path, fmt, label=None):
+        """Загрузка записей файла; возвращает модели отложенных записей.
+
+        С label загружаются только еще не загруженные записи этой модели,
+        а запись без связанной записи пропускается.
+        """
+        deferred = set()
+        with open(path, encoding='utf-8') as file:
+            for record in iter_records(file, fmt):
+                record_label = record.get('model', '').lower()
+                if record_label not in MODELS:
+                    continue
+                if label is not None and (
+                        record_label != label
+                        or record['pk'] in self.id_maps[label]):
+                    continue
+                if not self.add_record(record_label, record,
+                                       final=label is not None):
+                    deferred.add(record_label)
+        return deferred
+
+    def add_record(self, label, record, final=False):
+        """Добавление записи в буфер; False — связанная запись не найдена."""
+        values = self.convert_fields(label, record['fields'], final)
+        if values is None:
+            if final:
+                self.skipped += 1
+                return True
+            return False
+        if self.merge_existing(label, record['pk'], values):
+            return True
+        pk = self.next_pk[label]
+        self.next_pk[label] += 1
+        self.id_maps[label][record['pk']] = pk
+        obj = MODELS[label](pk=pk, **values)
+        if label == 'blog.post':
+            obj.is_visible = bool(
+                obj.is_published
+                and obj.category_id in self.published_categories
+                and obj.pub_date <= self.now
+            )
+        elif label == 'blog.category' and obj.is_published:
+            self.published_categories.add(pk)
+        self.buffers[label].append(obj)
+        self.progress.add()
+        if len(self.buffers[label]) >= self.batch_size:
+            self.flush()
+        return True
+
+    def convert_fields(self, label, fields, final):
+        """Значения полей для модели или None, если связь не найдена.
+
+        Необязательная связь обнуляется, только если связанной записи
+        нет во всем файле.
+        """
+        model = MODELS[label]
+        values = {}
+        for name, value in fields.items():
+            if name in DERIVED_FIELDS.get(label, ()):
+                continue
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                continue
+            if not field.many_to_one:
+                values[field.attname] = field.to_python(value)
+                continue
+            if value is not None:
+                target = field.related_model._meta.label_lower
+                value = self.id_maps[target].get(value)
+                if value is None and not (final and field.null):
+                    return None
+            values[field.attname] = value
+        return values
+
+    def merge_existing(self, label, pk, values):
+        """Сопоставление с существующей записью с тем же именем."""
+        if label == 'auth.user':
+            names, key = self.usernames, values['username']
+        elif label == 'blog.category':
+            names, key = self.slugs, values['slug']
+        else:
+            return False
+        if key in names:
+            self.id_maps[label][pk] = names[key]
+            return True
+        names[key] = self.next_pk[label]
+        return False
+
+    @transaction.atomic
+    def flush(self):
+        """Вставка накопленных записей всех моделей в порядке зависимостей."""
+        for label, model in MODELS.items():
+            if self.buffers[label]:
+                model.objects.bulk_create(
+                    self.buffers[label], batch_size=self.batch_size)
+                self.buffers[label] = []
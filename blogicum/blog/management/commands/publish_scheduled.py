@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache import bump_version
+from blog.models import Post
+from blog.querysets import posts_update_visibility
+from blog.signals import post_list_scopes
+
+
+class Command(BaseCommand):
+    help = ('Планировщик отложенных публикаций: делает посты видимыми '
+            'читателям, когда наступает их дата публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Наибольшая пауза между проверками, в секундах.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Число публикаций, открываемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить одну проверку и завершиться (для cron).'
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Предварительно пересчитать видимость всех публикаций.'
+        )
+
+    def handle(self, *args, interval, batch_size, once, rebuild,
+               **options):
+        if rebuild:
+            with transaction.atomic():
+                changed = posts_update_visibility(Post.objects.all())
+            bump_version('posts', 'categories')
+            self.stdout.write(f'Пересчитана видимость публикаций: {changed}.')
+        try:
+            while True:
+                published = self.publish_due(batch_size)
+                if published:
+                    self.stdout.write(f'Опубликовано постов: {published}.')
+                if once:
+                    break
+                time.sleep(self.pause(interval))
+        except KeyboardInterrupt:
+            pass
+
+    def due_posts(self):
+        return Post.objects.filter(
+            is_published=True,
+            is_visible=False,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+    def publish_due(self, batch_size):
+        """Открытие наступивших публикаций пачками и сброс кэша их страниц."""
+        total = 0
+        while True:
+            due = list(
+                self.due_posts().order_by('pub_date')
+                .values_list('pk', 'category_id', 'author_id')[:batch_size]
+            )
+            if not due:
+                return total
+            post_ids, category_ids, author_ids = zip(*due)
+            with transaction.atomic():
+                Post.objects.filter(pk__in=post_ids).update(is_visible=True)
+            bump_version(
+                'posts',
+                *(f'post:{post_id}' for post_id in post_ids),
+                *post_list_scopes(set(category_ids), set(author_ids)),
+            )
+            total += len(due)
+
+    def pause(self, interval):
+        """Пауза до ближайшей отложенной публикации, но не больше interval."""
+        now = timezone.now()
+        next_pub_date = (
+            Post.objects.filter(
+                is_published=True, is_visible=False, pub_date__gt=now)
+            .order_by('pub_date').values_list('pub_date', flat=True).first()
+        )
+        if next_pub_date is None:
+            return interval
+        return max(0, min(interval, (next_pub_date - now).total_seconds()))
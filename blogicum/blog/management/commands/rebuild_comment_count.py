@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.querysets import posts_update_comment_count
+
+
+class Command(BaseCommand):
+    help = 'Пересчет поля Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10_000,
+            help='Число публикаций, пересчитываемых в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += posts_update_comment_count(
+                    Post.objects.filter(pk__gt=last_pk, pk__lte=pks[-1]))
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}.'))
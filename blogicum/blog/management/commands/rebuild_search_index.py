@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import Post
+
+DELETE_ALL = 'DELETE FROM blog_post_search'
+INSERT_POSTS = (
+    'INSERT INTO blog_post_search(rowid, title, text, comments, post_id) '
+    "SELECT id, title, text, '', id "
+    'FROM blog_post WHERE id > %s AND id <= %s'
+)
+INSERT_COMMENTS = (
+    'INSERT INTO blog_post_search(rowid, title, text, comments, post_id) '
+    "SELECT -id, '', '', text, post_id "
+    'FROM blog_comment WHERE post_id > %s AND post_id <= %s'
+)
+OPTIMIZE = (
+    "INSERT INTO blog_post_search(blog_post_search) VALUES ('optimize')"
+)
+
+
+class Command(BaseCommand):
+    help = ('Перестроение полнотекстового индекса публикаций '
+            'по таблицам публикаций и комментариев.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10_000,
+            help='Число публикаций, индексируемых в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        indexed = 0
+        last_pk = 0
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_ALL)
+            while True:
+                pks = list(
+                    Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                with transaction.atomic():
+                    cursor.execute(INSERT_POSTS, (last_pk, pks[-1]))
+                    cursor.execute(INSERT_COMMENTS, (last_pk, pks[-1]))
+                indexed += len(pks)
+                last_pk = pks[-1]
+            # Слияние сегментов индекса после массовой вставки
+            cursor.execute(OPTIMIZE)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {indexed}.'))
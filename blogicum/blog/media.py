@@ -0,0 +1,146 @@
+"""Отдача загруженных файлов из MEDIA_ROOT.
+
+Замена django.views.static.serve: поддерживает условные запросы
+(If-None-Match, If-Modified-Since), диапазоны байтов (Range) и передачу
+отдачи файла фронт-прокси через X-Sendfile или X-Accel-Redirect.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .images import HASHED_NAME_RE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Время хранения в кэше браузера файлов с хэшем содержимого в имени
+HASHED_MAX_AGE = 365 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """Строгий ETag по размеру и времени изменения файла."""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """Границы (start, end) единственного диапазона из заголовка Range.
+
+    Возвращает None, если заголовок отсутствует или не поддерживается
+    (в этом случае отдается весь файл), и False, если диапазон
+    не пересекается с файлом.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        # bytes=-N — последние N байт файла
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """Проверка If-Range: диапазон отдается, только если файл не менялся."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(file, start, end):
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(path, name):
+    """Пустой ответ, по которому прокси сам отдает файл."""
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'X-Accel-Redirect':
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + name)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Отдача файла path из MEDIA_ROOT."""
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response(request, fullpath, path, stat, etag,
+                                  last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if HASHED_NAME_RE.match(os.path.basename(path)):
+        patch_cache_control(
+            response, public=True, max_age=HASHED_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def build_response(request, fullpath, name, stat, etag, last_modified):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_SENDFILE:
+        # Диапазоны и HEAD прокси обрабатывает самостоятельно
+        response = sendfile_response(fullpath, name)
+        response['Content-Type'] = content_type
+    else:
+        byte_range = None
+        if if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(
+                request.META.get('HTTP_RANGE'), stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(open(fullpath, 'rb'), start, end),
+                status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(
+                open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return response
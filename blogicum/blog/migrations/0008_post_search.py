@@ -0,0 +1,78 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Публикация индексируется строкой с rowid = id публикации, а каждый
+# комментарий — отдельной строкой с rowid = -id комментария: его
+# изменение не пересобирает тексты всех комментариев публикации.
+CREATE_SEARCH = [
+    "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+    "title, text, comments, post_id UNINDEXED, "
+    "tokenize='unicode61 remove_diacritics 2')",
+    # Заголовок весит больше текста, а текст — больше комментариев
+    "INSERT INTO blog_post_search(blog_post_search, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0, 0.5)')",
+    "INSERT INTO blog_post_search(rowid, title, text, comments, post_id) "
+    "SELECT id, title, text, '', id FROM blog_post",
+    "INSERT INTO blog_post_search(rowid, title, text, comments, post_id) "
+    "SELECT -id, '', '', text, post_id FROM blog_comment",
+    "CREATE TRIGGER blog_post_search_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_search(rowid, title, text, comments, post_id) "
+    "VALUES (new.id, new.title, new.text, '', new.id); END",
+    "CREATE TRIGGER blog_post_search_update AFTER UPDATE OF title, text "
+    "ON blog_post WHEN old.title IS NOT new.title OR old.text IS NOT new.text "
+    "BEGIN UPDATE blog_post_search SET title = new.title, text = new.text "
+    "WHERE rowid = new.id; END",
+    "CREATE TRIGGER blog_post_search_delete AFTER DELETE ON blog_post BEGIN "
+    "DELETE FROM blog_post_search WHERE rowid = old.id; END",
+    "CREATE TRIGGER blog_comment_search_insert AFTER INSERT ON blog_comment "
+    "BEGIN INSERT INTO blog_post_search"
+    "(rowid, title, text, comments, post_id) "
+    "VALUES (-new.id, '', '', new.text, new.post_id); END",
+    "CREATE TRIGGER blog_comment_search_update AFTER UPDATE OF text, post_id "
+    "ON blog_comment "
+    "WHEN old.text IS NOT new.text OR old.post_id IS NOT new.post_id BEGIN "
+    "UPDATE blog_post_search SET comments = new.text, post_id = new.post_id "
+    "WHERE rowid = -new.id; END",
+    "CREATE TRIGGER blog_comment_search_delete AFTER DELETE ON blog_comment "
+    "BEGIN DELETE FROM blog_post_search WHERE rowid = -old.id; END",
+]
+
+DROP_SEARCH = [
+    'DROP TRIGGER blog_comment_search_delete',
+    'DROP TRIGGER blog_comment_search_update',
+    'DROP TRIGGER blog_comment_search_insert',
+    'DROP TRIGGER blog_post_search_delete',
+    'DROP TRIGGER blog_post_search_update',
+    'DROP TRIGGER blog_post_search_insert',
+    'DROP TABLE blog_post_search',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearch',
+            fields=[
+                ('id', models.IntegerField(db_column='rowid', primary_key=True, serialize=False)),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('comments', models.TextField()),
+                ('match', models.TextField(db_column='blog_post_search')),
+                ('rank', models.FloatField()),
+                ('post', models.ForeignKey(db_column='post_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='search', to='blog.post')),
+            ],
+            options={
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_SEARCH, DROP_SEARCH),
+    ]
@@ -88,10 +88,44 @@ class Post(PublishedCreatedAtModel):
         verbose_name='Местоположение'
     )
     image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Число комментариев'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Доступно читателям',
+        help_text='Вычисляется по флажкам публичности поста и категории '
+                  'и дате публикации.'
+    )
 
     class Meta:
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        # Индексы повторяют условия и сортировку лент публикаций;
+        # частичные индексы хранят только видимые читателям записи.
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_category_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            # Отложенные публикации, ожидающие планировщика
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx',
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
@@ -111,8 +145,45 @@ class Comment(CreatedAtModel):
     class Meta:
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class PostSearch(models.Model):
+    """Полнотекстовый индекс публикаций.
+
+    Виртуальная таблица SQLite FTS5, которую создает миграция и обновляют
+    триггеры на таблицах публикаций и комментариев. Модель служит только
+    для чтения: через нее запрос к публикациям объединяется с индексом.
+    Публикация — строка с rowid = id публикации и заполненными title
+    и text, каждый комментарий — своя строка с rowid = -id комментария
+    и заполненным comments: изменение комментария обновляет одну строку.
+    """
+
+    id = models.IntegerField(primary_key=True, db_column='rowid')
+    post = models.ForeignKey(
+        Post, db_column='post_id', on_delete=models.DO_NOTHING,
+        related_name='search',
+    )
+    title = models.TextField()
+    text = models.TextField()
+    comments = models.TextField()
+    # Скрытый столбец с именем таблицы: условие «столбец = запрос»
+    # FTS5 выполняет как MATCH.
+    match = models.TextField(db_column='blog_post_search')
+    # Скрытый столбец с оценкой релевантности bm25, веса столбцов
+    # задает миграция: чем меньше значение, тем выше релевантность.
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
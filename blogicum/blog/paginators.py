@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from core import routing
+
+from .cache import get_version
+
+
+class InvalidCursor(Exception):
+    """Курсор пагинации не удалось разобрать."""
+
+
+class CursorPage:
+    """Страница выборки, полученная по курсору.
+
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которая используется в CBV и шаблонах.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по паре полей вида ('-pub_date', '-id').
+
+    В отличие от django.core.paginator.Paginator не использует OFFSET
+    и не считает COUNT(*): страница выбирается условием по значениям
+    ключа последней показанной записи, поэтому стоимость запроса
+    не зависит от глубины страницы.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def page(self, cursor=None):
+        """Страница после (или перед) записью, закодированной в курсоре."""
+        if not cursor:
+            return self._forward_page(self.object_list, has_previous=False)
+        direction, values = self.decode_cursor(cursor)
+        if direction == 'next':
+            return self._forward_page(
+                self.object_list.filter(self._after(values)),
+                has_previous=True,
+            )
+        return self._backward_page(values)
+
+    def _forward_page(self, queryset, has_previous):
+        items = list(
+            queryset.order_by(*self.ordering)[:self.per_page + 1]
+        )
+        has_next = len(items) > self.per_page
+        items = items[:self.per_page]
+        return CursorPage(
+            items,
+            self,
+            next_cursor=(
+                self.encode_cursor('next', items[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor('previous', items[0])
+                if has_previous and items else None
+            ),
+        )
+
+    def _backward_page(self, values):
+        reversed_ordering = tuple(
+            name.lstrip('-') if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+        items = list(
+            self.object_list.filter(self._before(values))
+            .order_by(*reversed_ordering)[:self.per_page + 1]
+        )
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return CursorPage(
+            items,
+            self,
+            next_cursor=(
+                self.encode_cursor('next', items[-1]) if items else None
+            ),
+            previous_cursor=(
+                self.encode_cursor('previous', items[0])
+                if has_previous else None
+            ),
+        )
+
+    def _compare(self, values, lookup):
+        first, second = self.fields
+        return (
+            Q(**{f'{first}__{lookup}': values[0]})
+            | Q(**{first: values[0], f'{second}__{lookup}': values[1]})
+        )
+
+    def _after(self, values):
+        """Условие для записей, идущих после курсора."""
+        return self._compare(values, 'lt' if self.descending else 'gt')
+
+    def _before(self, values):
+        """Условие для записей, идущих перед курсором."""
+        return self._compare(values, 'gt' if self.descending else 'lt')
+
+    def _field(self, name):
+        """Поле модели или аннотации выборки, по которому идет сортировка."""
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def encode_cursor(self, direction, obj):
+        # Выборка values() возвращает словари, а не объекты моделей
+        if isinstance(obj, dict):
+            values = [obj[name] for name in self.fields]
+        else:
+            values = [getattr(obj, name) for name in self.fields]
+        payload = [direction] + values
+        # isoformat() сохраняет микросекунды, которые DjangoJSONEncoder
+        # отбрасывает: без них курсор не совпадёт с записью в БД.
+        raw = json.dumps(payload, default=lambda value: value.isoformat())
+        raw = raw.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, *values = json.loads(raw)
+        except (binascii.Error, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if direction not in ('next', 'previous') or len(values) != 2:
+            raise InvalidCursor(cursor)
+        try:
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        if None in values:
+            raise InvalidCursor(cursor)
+        return direction, values
+
+
+class CachedCountPaginator(Paginator):
+    """Постраничная навигация с кэшированным числом записей.
+
+    COUNT(*) по ленте выполняется один раз на версию данных 'posts'
+    и не чаще, чем раз в COUNT_CACHE_TIMEOUT секунд. Число,
+    посчитанное по реплике вскоре после изменения, не кэшируется:
+    реплика могла еще не получить изменение.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        version = get_version('posts')
+        key = f'blog:count:{version}:{self.cache_key}'
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            if not (routing.read_alias.get()
+                    and routing.changed_recently(version)):
+                cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
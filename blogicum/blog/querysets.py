@@ -1,6 +1,11 @@
-import datetime as dt
+import re
 
-from django.db.models import Count
+from django.conf import settings
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment
 
 
 def posts_select_related(posts):
@@ -10,19 +15,51 @@ def posts_select_related(posts):
     )
 
 
-def posts_filter(posts):
-    """Фильтрация данных по дате публикации и флажкам публичности."""
-    return posts.filter(
-        pub_date__lte=dt.datetime.now(),
+def posts_visible_q():
+    """Условие видимости публикации для всех пользователей.
+
+    Флажки публичности поста и категории сведены в поле is_visible,
+    поэтому условие не требует объединения с таблицей категорий.
+    """
+    return Q(is_visible=True, pub_date__lte=timezone.now())
+
+
+def posts_visibility_q():
+    """Условие, по которому вычисляется поле is_visible."""
+    return Q(
+        pub_date__lte=timezone.now(),
         is_published=True,
         category__is_published=True
     )
 
 
+def posts_filter(posts):
+    """Фильтрация данных по дате публикации и флажкам публичности."""
+    return posts.filter(posts_visible_q())
+
+
+def posts_visible_to(posts, user):
+    """Публикации, видимые пользователю: общедоступные и его собственные."""
+    condition = posts_visible_q()
+    if user.is_authenticated:
+        condition |= Q(author_id=user.pk)
+    return posts.filter(condition)
+
+
 def posts_annotate_order(posts):
-    """Аннотация счетчика комментариев и упорядочивание по дате публикации."""
+    """Аннотация счетчика комментариев и упорядочивание по дате публикации.
+
+    При включенной настройке POSTS_COMMENT_COUNT_COLUMN счетчик читается
+    из поля Post.comment_count, иначе считается агрегатом по комментариям.
+    """
+    if settings.POSTS_COMMENT_COUNT_COLUMN:
+        comments_number = F('comment_count')
+    else:
+        # distinct: при поиске публикация объединяется и со строками
+        # индекса
+        comments_number = Count('comments', distinct=True)
     return posts.annotate(
-        comment_count=Count('comments')
+        comments_number=comments_number
     ).order_by('-pub_date')
 
 
@@ -31,3 +68,48 @@ def post_query(posts):
     selected_posts = posts_annotate_order(posts)
     selected_posts = posts_select_related(selected_posts)
     return posts_filter(selected_posts)
+
+
+def search_query(text):
+    """Запрос FTS5 из строки поиска пользователя.
+
+    Каждое слово берется в кавычки, чтобы символы синтаксиса FTS5
+    не вызывали ошибок, и ищется как префикс, чтобы находить
+    другие формы слова. Возвращает None, если слов в строке нет.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def posts_search(posts, query):
+    """Публикации, найденные по индексу FTS5, с оценкой релевантности.
+
+    Публикация и ее комментарии — отдельные строки индекса, поэтому
+    оценка публикации — лучшая (наименьшая) оценка ее строк.
+    """
+    return posts.filter(search__match=query).annotate(
+        rank=Min('search__rank')
+    )
+
+
+def posts_update_visibility(posts):
+    """Пересчет поля is_visible по выборке публикаций."""
+    shown = posts.filter(
+        posts_visibility_q(), is_visible=False).update(is_visible=True)
+    hidden = posts.filter(
+        ~posts_visibility_q(), is_visible=True).update(is_visible=False)
+    return shown + hidden
+
+
+def posts_update_comment_count(posts):
+    """Пересчет поля comment_count одним UPDATE по выборке публикаций."""
+    comments_number = (
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by().values('post').annotate(number=Count('pk'))
+        .values('number')
+    )
+    return posts.update(
+        comment_count=Coalesce(Subquery(comments_number), Value(0))
+    )
@@ -0,0 +1,218 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Category, Comment, Location, Post
+from .querysets import posts_update_visibility
+
+User = get_user_model()
+
+# Публикации, удаляемые в текущем потоке: их комментарии удаляются
+# каскадно, и обновлять по ним счетчик и кэш не нужно.
+_deleting = threading.local()
+
+
+def deleting_post_ids():
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def change_comment_count(post_id, delta):
+    """Изменение счетчика комментариев одним UPDATE без чтения публикации."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def post_list_scopes(category_ids=(), author_ids=()):
+    """Наборы данных лент, в которых выводятся публикации."""
+    category_slugs = Category.objects.filter(
+        pk__in=category_ids).values_list('slug', flat=True)
+    usernames = User.objects.filter(
+        pk__in=author_ids).values_list('username', flat=True)
+    return (
+        ['feed']
+        + [f'category:{slug}' for slug in category_slugs]
+        + [f'profile:{username}' for username in usernames]
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, **kwargs):
+    """Запоминание прежней публикации при редактировании комментария."""
+    instance._previous_post_id = None
+    if instance.pk and not raw:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('post_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Учет нового комментария или его переноса в другую публикацию."""
+    if raw:
+        # Фикстура уже содержит comment_count публикации
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Учет удаленного комментария."""
+    if instance.post_id not in deleting_post_ids():
+        change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, created=True, **kwargs):
+    """Сброс кэша страниц, на которых выводится комментарий.
+
+    Число комментариев выводится в лентах, поэтому при его изменении
+    сбрасываются и ленты публикации; правка текста затрагивает только
+    страницу публикации и результаты поиска.
+    """
+    if instance.post_id in deleting_post_ids():
+        return
+    post_ids = {instance.post_id}
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id:
+        post_ids.add(previous_post_id)
+    # Текст комментария индексируется поиском
+    scopes = ['search', *(f'post:{post_id}' for post_id in post_ids)]
+    if created or len(post_ids) > 1:
+        relations = Post.objects.filter(pk__in=post_ids).values_list(
+            'category_id', 'author_id')
+        category_ids, author_ids = zip(*relations) if relations else ((), ())
+        scopes += post_list_scopes(category_ids, author_ids)
+    bump_version(*scopes)
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, raw, **kwargs):
+    """Вычисление видимости публикации для читателей."""
+    if raw:
+        # При загрузке фикстур категория может быть еще не загружена
+        category_published = Category.objects.filter(
+            pk=instance.category_id, is_published=True).exists()
+    else:
+        category_published = (instance.category_id
+                              and instance.category.is_published)
+    instance.is_visible = bool(
+        instance.is_published
+        and category_published
+        and instance.pub_date <= timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_relations(sender, instance, raw, **kwargs):
+    """Запоминание прежних категории и автора редактируемой публикации."""
+    instance._previous_relations = None
+    if instance.pk and not raw:
+        instance._previous_relations = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('category_id', 'author_id').first()
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleting_post(sender, instance, **kwargs):
+    deleting_post_ids().add(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """Сброс кэша страниц, на которых выводится публикация."""
+    deleting_post_ids().discard(instance.pk)
+    category_ids = {instance.category_id}
+    author_ids = {instance.author_id}
+    previous_relations = getattr(instance, '_previous_relations', None)
+    if previous_relations:
+        category_ids.add(previous_relations[0])
+        author_ids.add(previous_relations[1])
+    bump_version(
+        'posts',
+        'search',
+        f'post:{instance.pk}',
+        *post_list_scopes(category_ids, author_ids),
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields=None, **kwargs):
+    """Запоминание прежнего имени пользователя при редактировании профиля."""
+    instance._previous_username = None
+    if (instance.pk and not raw
+            and (update_fields is None or 'username' in update_fields)):
+        instance._previous_username = (
+            User.objects.filter(pk=instance.pk)
+            .values_list('username', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile_pages(sender, instance, update_fields=None, **kwargs):
+    """Сброс кэша страницы профиля по прежнему и новому имени.
+
+    Вход пользователя сохраняет только last_login, который на страницах
+    не выводится. Имя пользователя выводится и в карточках его
+    публикаций и в комментариях, поэтому при его смене сбрасываются
+    и эти страницы.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    scopes = [f'profile:{instance.username}']
+    previous_username = getattr(instance, '_previous_username', None)
+    if previous_username and previous_username != instance.username:
+        scopes.append(f'profile:{previous_username}')
+        posts = Post.objects.filter(author=instance)
+        post_ids = set(posts.values_list('pk', flat=True)).union(
+            Comment.objects.filter(author=instance)
+            .values_list('post_id', flat=True))
+        category_ids = set(posts.values_list('category_id', flat=True))
+        scopes += ['posts', *post_list_scopes(category_ids)]
+        scopes += [f'post:{post_id}' for post_id in post_ids]
+    bump_version(*scopes)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, **kwargs):
+    """Пересчет видимости публикаций категории одним UPDATE."""
+    posts_update_visibility(instance.posts.all())
+
+
+@receiver(post_delete, sender=Category)
+def hide_uncategorized_posts(sender, **kwargs):
+    """Публикации удаленной категории остаются без категории и скрываются."""
+    Post.objects.filter(category=None, is_visible=True).update(
+        is_visible=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, **kwargs):
+    """Категории выводятся на всех страницах — сброс всего кэша страниц."""
+    bump_version('posts', 'categories')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, **kwargs):
+    """Местоположения выводятся на всех страницах — сброс кэша страниц."""
+    bump_version('locations')
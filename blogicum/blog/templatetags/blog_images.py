@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.urls import reverse
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_variant_url(image, width, height=None):
+    """URL уменьшенной копии изображения, вписанной в width x height."""
+    return reverse('blog:image_variant', kwargs={
+        'width': width,
+        'height': height or width,
+        'path': image.name,
+    })
+
+
+@register.simple_tag
+def image_srcset(image):
+    """Значение атрибута srcset со всеми размерами IMAGE_VARIANT_SIZES."""
+    return ', '.join(
+        f'{image_variant_url(image, width, height)} {width}w'
+        for width, height in settings.IMAGE_VARIANT_SIZES
+    )
@@ -2,7 +2,7 @@
 from django.urls import include, path
 
 # Импорт модуля view-функций
-from . import views
+from . import api, feeds, views
 
 # Определение namespace
 app_name = 'blog'
@@ -13,6 +13,8 @@ extra_patterns_posts_pk = [
     path('edit/', views.PostUpdateView.as_view(), name='edit_post'),
     path('delete/', views.PostDeleteView.as_view(), name='delete_post'),
     path('comment/', views.CommentCreateView.as_view(), name='add_comment'),
+    path('comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
 ]
 
 extra_patterns_post_id = [
@@ -28,13 +30,32 @@ extra_patterns_posts = [
     path('<int:pk>/', include(extra_patterns_post_id)),
 ]
 
+api_patterns = [
+    path('posts/', api.ApiPostListView.as_view(), name='api_posts'),
+    path('posts/<int:pk>/comments/', api.ApiCommentListView.as_view(),
+         name='api_comments'),
+    path('category/<slug:category_slug>/',
+         api.ApiCategoryPostListView.as_view(), name='api_category_posts'),
+    path('profile/<username>/', api.ApiProfilePostListView.as_view(),
+         name='api_profile'),
+]
+
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('feed/<feed_format>/', feeds.PostFeedView.as_view(), name='feed'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('posts/', include(extra_patterns_posts)),
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
+    path('category/<slug:category_slug>/feed/<feed_format>/',
+         feeds.CategoryFeedView.as_view(), name='category_feed'),
     path('profile/<username>/', views.ProfileListView.as_view(),
          name='profile'),
+    path('profile/<username>/feed/<feed_format>/',
+         feeds.ProfileFeedView.as_view(), name='profile_feed'),
     path('edit_profile/<int:pk>/', views.UserUpdateView.as_view(),
          name='edit_profile'),
+    path('api/', include(api_patterns)),
+    path('media/resized/<int:width>x<int:height>/<path:path>',
+         views.ImageVariantView.as_view(), name='image_variant'),
 ]
@@ -1,51 +1,167 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from django.shortcuts import get_object_or_404
-from django.urls import reverse
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, Http404, JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic import (CreateView, DeleteView, DetailView,
                                   ListView, UpdateView)
+from django.views.generic.base import View
 from django.views.generic.detail import SingleObjectMixin
 
-from .cbv_mixins import (CheckAuthorshipMixin, CommentUpdateDeleteMixin,
-                         PostUpdateDeleteViewMixin, RedirectProfileMixin)
+from .cbv_mixins import (CachedCountPaginationMixin, CheckAuthorshipMixin,
+                         CommentUpdateDeleteMixin, ConditionalPageMixin,
+                         CursorPaginationMixin, PostSearchMixin,
+                         PostUpdateDeleteViewMixin, RedirectProfileMixin,
+                         ReplicaReadMixin, WriteQueueMixin)
 from .forms import PostForm, CommentForm
+from .images import CONTENT_TYPES, open_image_variant, variant_etag
 from .models import Category, Post, Comment
-from .querysets import post_query, posts_annotate_order, posts_filter
+from .paginators import CursorPaginator, InvalidCursor
+from .querysets import (post_query, posts_annotate_order,
+                        posts_select_related)
 
 # Число отображаемых на странице постов
 POSTS_NUMBER = 10
+# Число комментариев, выводимых на странице поста за один раз
+COMMENTS_NUMBER = 20
+# Время хранения уменьшенных копий изображений в кэше браузера, в секундах
+IMAGE_VARIANT_MAX_AGE = 365 * 24 * 60 * 60
 
 
-class PostListView(ListView):
-    """Вывод списка публикаций на главной странице."""
+class PostListView(ReplicaReadMixin, ConditionalPageMixin, PostSearchMixin,
+                   CursorPaginationMixin, CachedCountPaginationMixin,
+                   ListView):
+    """Вывод списка публикаций на главной странице.
+
+    С параметром q выводятся публикации, найденные поиском.
+    """
 
     model = Post
     paginate_by = POSTS_NUMBER
-    queryset = post_query(Post.objects)
     template_name = 'blog/index.html'
 
+    def get_page_cache_scopes(self):
+        scopes = super().get_page_cache_scopes() + ('feed',)
+        if self.get_search_query() is not None:
+            # Поиск учитывает тексты комментариев, которых нет в ленте
+            scopes += ('search',)
+        return scopes
+
+    def get_queryset(self):
+        return post_query(Post.objects)
+
+
+class PostSearchView(PostListView):
+    """Страница поиска по публикациям."""
+
+    template_name = 'blog/search.html'
+
+    def get_queryset(self):
+        if self.get_search_query() is None:
+            return Post.objects.none()
+        return super().get_queryset()
+
 
-class PostDetailView(CheckAuthorshipMixin, DetailView):
+def comments_paginator(post):
+    """Keyset-пагинация комментариев публикации по (created_at, id)."""
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_NUMBER,
+        ordering=('created_at', 'id'),
+    )
+
+
+class PostDetailView(ReplicaReadMixin, ConditionalPageMixin,
+                     CheckAuthorshipMixin, DetailView):
     """Вывод полной информации о публикации."""
 
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_page_cache_scopes(self):
+        return (super().get_page_cache_scopes()
+                + (f'post:{self.kwargs[self.pk_url_kwarg]}',))
+
+    def page_object_exists(self):
+        return self.get_queryset().filter(
+            pk=self.kwargs[self.pk_url_kwarg]).exists()
+
     def get_context_data(self, **kwargs):
-        """Дополнение контекста данными по комментариям."""
+        """Дополнение контекста первой порцией комментариев."""
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = comments_paginator(self.object).page()
         return context
 
 
-class CategoryListView(SingleObjectMixin, ListView):
+class PostCommentsView(ConditionalPageMixin, CheckAuthorshipMixin,
+                       DetailView):
+    """Очередная порция комментариев к публикации.
+
+    Возвращает HTML-фрагмент для подгрузки на странице поста
+    или JSON при параметре format=json.
+    """
+
+    model = Post
+    template_name = 'includes/comments_list.html'
+
+    def get_page_cache_scopes(self):
+        return (super().get_page_cache_scopes()
+                + (f'post:{self.kwargs[self.pk_url_kwarg]}',))
+
+    def page_object_exists(self):
+        return self.get_queryset().filter(
+            pk=self.kwargs[self.pk_url_kwarg]).exists()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            context['comments'] = comments_paginator(self.object).page(
+                self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор комментариев.')
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') != 'json':
+            return super().render_to_response(context, **response_kwargs)
+        comments = context['comments']
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at,
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+
+
+class CategoryListView(ReplicaReadMixin, ConditionalPageMixin,
+                       CursorPaginationMixin, CachedCountPaginationMixin,
+                       SingleObjectMixin, ListView):
     """Вывод постов определенной категории."""
 
     paginate_by = POSTS_NUMBER
     slug_url_kwarg = 'category_slug'
     template_name = 'blog/category.html'
 
+    def get_page_cache_scopes(self):
+        return (super().get_page_cache_scopes()
+                + (f'category:{self.kwargs[self.slug_url_kwarg]}',))
+
+    def page_object_exists(self):
+        return Category.objects.filter(
+            is_published=True, slug=self.kwargs[self.slug_url_kwarg]).exists()
+
     def get(self, request, *args, **kwargs):
         """Выбор необходимого объекта модели Category."""
         self.object = self.get_object(
@@ -59,10 +175,12 @@ class CategoryListView(SingleObjectMixin, ListView):
         return context
 
     def get_queryset(self):
-        return posts_filter(self.object.posts)
+        return post_query(self.object.posts)
 
 
-class ProfileListView(SingleObjectMixin, ListView):
+class ProfileListView(ReplicaReadMixin, ConditionalPageMixin,
+                      CursorPaginationMixin, CachedCountPaginationMixin,
+                      SingleObjectMixin, ListView):
     """Отображение страницы с профилем пользователя."""
 
     paginate_by = POSTS_NUMBER
@@ -70,6 +188,14 @@ class ProfileListView(SingleObjectMixin, ListView):
     slug_url_kwarg = 'username'
     template_name = 'blog/profile.html'
 
+    def get_page_cache_scopes(self):
+        return (super().get_page_cache_scopes()
+                + (f'profile:{self.kwargs[self.slug_url_kwarg]}',))
+
+    def page_object_exists(self):
+        return User.objects.filter(
+            username=self.kwargs[self.slug_url_kwarg]).exists()
+
     def get(self, request, *args, **kwargs):
         """Выбор необходимого объекта модели User."""
         self.object = self.get_object(User.objects)
@@ -81,6 +207,11 @@ class ProfileListView(SingleObjectMixin, ListView):
         context['profile'] = self.object
         return context
 
+    def get_count_cache_key(self):
+        """Хозяину аккаунта и остальным пользователям видны разные посты."""
+        is_owner = self.request.user == self.object
+        return f'{super().get_count_cache_key()}:{is_owner}'
+
     def get_queryset(self):
         """Формирование необходимой выборки из БД.
 
@@ -89,22 +220,38 @@ class ProfileListView(SingleObjectMixin, ListView):
         """
         if self.request.user != self.object:
             return post_query(self.object.posts)
-        return posts_annotate_order(self.object.posts)
+        return posts_select_related(posts_annotate_order(self.object.posts))
+
+
+class RegistrationView(WriteQueueMixin, CreateView):
+    """Регистрация нового пользователя."""
 
+    form_class = UserCreationForm
+    template_name = 'registration/registration_form.html'
+    success_url = reverse_lazy('blog:index')
 
-class UserUpdateView(UserPassesTestMixin, RedirectProfileMixin, UpdateView):
+
+class UserUpdateView(WriteQueueMixin, UserPassesTestMixin,
+                     RedirectProfileMixin, UpdateView):
     """Редактирование профиля пользователя."""
 
     model = User
     fields = ('first_name', 'last_name', 'username', 'email',)
     template_name = 'blog/user.html'
 
+    def get_object(self, queryset=None):
+        """Профиль читается из БД один раз на проверку доступа и форму."""
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
     def test_func(self):
         """Проверка соответствия пользователя хозяину аккаунта."""
-        return self.request.user == self.get_object(User.objects)
+        return self.request.user == self.get_object()
 
 
-class PostCreateView(LoginRequiredMixin, RedirectProfileMixin, CreateView):
+class PostCreateView(WriteQueueMixin, LoginRequiredMixin, RedirectProfileMixin,
+                     CreateView):
     """Создание нового поста (только для залогиненных пользователей)."""
 
     model = Post
@@ -136,17 +283,17 @@ class PostDeleteView(PostUpdateDeleteViewMixin, RedirectProfileMixin,
         return context
 
 
-class CommentCreateView(LoginRequiredMixin, CheckAuthorshipMixin, CreateView):
+class CommentCreateView(WriteQueueMixin, LoginRequiredMixin,
+                        CheckAuthorshipMixin, CreateView):
     """Создание нового комментария (только для залогиненных пользователей)."""
 
     form = Comment
     form_class = CommentForm
 
     def form_valid(self, form):
-        post = get_object_or_404(self.get_queryset(), pk=self.kwargs['pk'])
         # Автозаполнение полей, которые не выводятся на страницу
         form.instance.author = self.request.user
-        form.instance.post_id = post.pk
+        form.instance.post = self.get_object()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -162,3 +309,34 @@ class CommentUpdateView(CommentUpdateDeleteMixin, UpdateView):
 
 class CommentDeleteView(CommentUpdateDeleteMixin, DeleteView):
     """Удаление комментария."""
+
+
+def image_variant_etag(request, width, height, path):
+    if (width, height) not in settings.IMAGE_VARIANT_SIZES:
+        return None
+    return variant_etag(path, (width, height))
+
+
+@method_decorator(
+    [cache_control(public=True, max_age=IMAGE_VARIANT_MAX_AGE, immutable=True),
+     condition(etag_func=image_variant_etag)],
+    name='get',
+)
+class ImageVariantView(View):
+    """Уменьшенная копия изображения публикации для srcset.
+
+    Допустимы только размеры из IMAGE_VARIANT_SIZES. Повторный запрос
+    с совпадающим If-None-Match получает ответ 304 без чтения файла.
+    """
+
+    def get(self, request, width, height, path):
+        size = (width, height)
+        if size not in settings.IMAGE_VARIANT_SIZES:
+            raise Http404
+        try:
+            variant = open_image_variant(path, size)
+        except (FileNotFoundError, ValidationError):
+            raise Http404
+        return FileResponse(
+            variant, content_type=CONTENT_TYPES[settings.POST_IMAGE_FORMAT],
+        )
@@ -46,6 +46,7 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -57,18 +58,127 @@ INSTALLED_APPS = [
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
+# Keyset-пагинация лент публикаций вместо постраничной (OFFSET)
+POSTS_CURSOR_PAGINATION = os.getenv(
+    'POSTS_CURSOR_PAGINATION', 'False') == 'True'
+
+# Кэш: по умолчанию в памяти процесса; для нескольких процессов
+# приложения нужен общий бэкенд (например, Memcached или Redis).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'blogicum'),
+    }
+}
+
+# Время жизни страниц в кэше для неавторизованных пользователей, в секундах
+PAGE_CACHE_TIMEOUT = 300
+# Время жизни версий наборов данных в кэше, в секундах: ключи версий
+# создаются и по адресам несуществующих категорий и профилей
+VERSION_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Время жизни кэшированного числа публикаций в лентах, в секундах
+COUNT_CACHE_TIMEOUT = 60
+
+# Чтение числа комментариев из поля Post.comment_count вместо агрегата
+POSTS_COMMENT_COUNT_COLUMN = os.getenv(
+    'POSTS_COMMENT_COUNT_COLUMN', 'True') == 'True'
+
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
+
+# Отдача загруженных файлов: None — файл читает Django, 'X-Sendfile'
+# (Apache, lighttpd) или 'X-Accel-Redirect' (nginx) — файл отдает прокси.
+# Для nginx префикс должен совпадать с internal-location, указывающим
+# на MEDIA_ROOT.
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Время хранения в кэше браузера файлов без хэша содержимого в имени
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Загрузки больше этого размера записываются во временный файл на диске,
+# а не держатся в памяти процесса
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+# Обработка изображений публикаций при загрузке
+POST_IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+POST_IMAGE_MAX_SIZE = (1600, 1600)
+POST_IMAGE_FORMAT = 'JPEG'
+POST_IMAGE_QUALITY = 82
+
+# Уменьшенные копии изображений для srcset: допустимые размеры (ширина,
+# высота), каталог дискового кэша и его предельный объем в байтах
+IMAGE_VARIANT_SIZES = ((320, 320), (640, 640), (1280, 1280))
+IMAGE_VARIANT_ROOT = BASE_DIR / 'media_cache'
+IMAGE_VARIANT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+# Интервал пересчета объема кэша обходом каталога, в секундах: между
+# обходами процесс учитывает только созданные им копии
+IMAGE_VARIANT_RESCAN_INTERVAL = 300
 
 MIDDLEWARE = [
+    # Первым, чтобы время запроса включало остальные middleware
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Строка JSON с временем SQL и шаблонов для каждого запроса
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'blogicum.requests': {
+            'handlers': ['requests'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'blogicum.nplusone': {
+            'handlers': ['requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Обнаружение запросов N+1: 'log' — предупреждение в журнал,
+# 'raise' — исключение (для тестов), пустое значение — отключено
+NPLUSONE_DETECTION = os.getenv('NPLUSONE_DETECTION', 'log' if DEBUG else '')
+NPLUSONE_THRESHOLD = 3
+
+# Профилирование запросов: сотрудник добавляет заголовок X-Profile
+# или параметр _profile; PROFILING_SAMPLE_RATE=N профилирует
+# случайный запрос из N
+PROFILING_ROOT = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 200
+PROFILING_HEADER = 'X-Profile'
+PROFILING_QUERY_PARAM = '_profile'
+PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', 0))
+
+# Метрики Prometheus: счетчики процессов хранятся в файлах каталога
+# METRICS_ROOT (лучше в tmpfs), /metrics доступен с адресов
+# METRICS_ALLOWED_IPS
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_ROOT = os.getenv('METRICS_ROOT', BASE_DIR / 'metrics')
+METRICS_ALLOWED_IPS = ['127.0.0.1']
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -107,8 +217,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Реплика для чтения (core/routing.py); локально — копия основной
+    # БД, обновляемая командой sync_replica. В тестах — та же БД
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': (os.getenv('REPLICA_DATABASE')
+                 or BASE_DIR / 'db.replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routing.ReplicaRouter']
+
+# Соединение, из которого читают представления с ReplicaReadMixin;
+# пустая строка — чтение из основной БД
+READ_REPLICA = 'replica' if os.getenv('REPLICA_DATABASE') else ''
+# Сколько секунд после записи пользователь, а после изменения данных
+# страницы — все пользователи этой страницы читают из основной БД.
+# Должно превышать отставание реплики (интервал sync_replica)
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения SQLite (core/db.py): WAL
+# не блокирует чтение при записи, busy_timeout (мс) ждет освобождения
+# блокировки записи, cache_size со знаком минус задается в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
+# Транзакции atomic() сразу берут блокировку записи (BEGIN IMMEDIATE)
+SQLITE_IMMEDIATE_TRANSACTIONS = True
+# Очередь записи (core/writes.py): '' — отключена, 'process' — один
+# пишущий поток в процессе, 'host' — еще и блокировка файла, чтобы
+# процессы сервера писали по очереди
+SQLITE_WRITE_QUEUE = os.getenv('SQLITE_WRITE_QUEUE', '')
+SQLITE_WRITE_LOCK_FILE = BASE_DIR / 'db.sqlite3.lock'
+# Наибольшее число записей в одной транзакции и время ожидания
+# следующей записи для группы, в секундах
+SQLITE_WRITE_BATCH_SIZE = 32
+SQLITE_WRITE_BATCH_WAIT = 0.002
+# Время ожидания результата записи вызывающим потоком, в секундах
+SQLITE_WRITE_TIMEOUT = 30
 
 
 # Password validation
@@ -14,14 +14,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-# Импортируем функцию, позволяющую серверу разработки отдавать файлы.
-from django.conf.urls.static import static
 from django.contrib import admin
-# Имопрт классов для создания нового пользователя
-from django.contrib.auth.forms import UserCreationForm
-from django.views.generic.edit import CreateView
 # Импорт функций для формирования списка URL-адресов
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path
+
+# Отдача загруженных файлов с поддержкой условных запросов и диапазонов
+from blog.media import serve
+# Представление для создания нового пользователя
+from blog.views import RegistrationView
+# Метрики в формате Prometheus
+from core.views import metrics_view
 
 # Формирование списка шаблонов URL-адресов
 urlpatterns = [
@@ -29,13 +31,12 @@ urlpatterns = [
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
-    path('auth/registration/', CreateView.as_view(
-        template_name='registration/registration_form.html',
-        form_class=UserCreationForm,
-        success_url=reverse_lazy('blog:index'),),
-        name='registration',
-    ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('auth/registration/', RegistrationView.as_view(),
+         name='registration'),
+    path('metrics', metrics_view, name='metrics'),
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve,
+            name='media'),
+]
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
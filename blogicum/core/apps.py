@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Служебные инструменты'
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
+        from . import db, metrics, routing, timing
+        # PRAGMA соединений SQLite и режим начала транзакций
+        db.configure_sqlite()
+        # Замер времени рендеринга шаблонов для RequestTimingMiddleware
+        timing.instrument_templates()
+        # Доля попаданий в кэш для /metrics
+        metrics.instrument_caches()
+        # Чтение из основной БД после входа пользователя
+        user_logged_in.connect(routing.remember_login)
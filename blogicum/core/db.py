@@ -0,0 +1,37 @@
+"""Настройка соединений SQLite для работы нескольких процессов сервера.
+
+PRAGMA из SQLITE_PRAGMAS выполняются для каждого нового соединения
+(сигнал connection_created). Режим WAL позволяет читателям работать
+параллельно с записью, busy_timeout заставляет ждать освобождения
+блокировки вместо немедленной ошибки «database is locked».
+
+С SQLITE_IMMEDIATE_TRANSACTIONS транзакции atomic() начинаются
+с BEGIN IMMEDIATE: блокировка записи берется в начале транзакции.
+Иначе транзакция, которая сначала читает, а потом пишет, не может
+дождаться блокировки (SQLite сразу возвращает SQLITE_BUSY, чтобы
+избежать взаимной блокировки) и завершается ошибкой даже при
+busy_timeout.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def start_transaction_under_autocommit(self):
+    mode = ' IMMEDIATE' if settings.SQLITE_IMMEDIATE_TRANSACTIONS else ''
+    self.cursor().execute(f'BEGIN{mode}')
+
+
+def configure_sqlite():
+    connection_created.connect(apply_pragmas,
+                               dispatch_uid='core.db.apply_pragmas')
+    DatabaseWrapper._start_transaction_under_autocommit = (
+        start_transaction_under_autocommit)
@@ -0,0 +1,46 @@
+import pstats
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = ('Список сохраненных профилей запросов по представлениям '
+            'и сводная статистика cProfile для представления.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'view', nargs='?',
+            help='Имя представления, например blog:profile; без него '
+                 'выводится только список профилей.'
+        )
+        parser.add_argument(
+            '--sort', default='cumulative',
+            help='Поле сортировки pstats: cumulative, tottime, calls.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=30,
+            help='Число выводимых функций.'
+        )
+
+    def handle(self, *args, view, sort, limit, **options):
+        by_view = defaultdict(list)
+        for path in profiling.list_profiles():
+            by_view[profiling.view_name(path)].append(path)
+        if view is None:
+            if not by_view:
+                self.stdout.write('Профилей нет.')
+            for name, paths in sorted(by_view.items()):
+                self.stdout.write(
+                    f'{name}: {len(paths)}, последний {paths[-1].name}')
+            return
+        if view not in by_view:
+            raise CommandError(f'Нет профилей представления {view}.')
+        paths = by_view[view]
+        stats = pstats.Stats(*map(str, paths), stream=self.stdout)
+        self.stdout.write(
+            f'{view}: профилей {len(paths)}, в среднем '
+            f'{stats.total_tt / len(paths) * 1000:.1f} мс на запрос')
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
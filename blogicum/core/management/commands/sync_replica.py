@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирование основной БД SQLite в файл реплики для чтения '
+            '(READ_REPLICA) через резервное копирование SQLite.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            help='Файл реплики; по умолчанию NAME соединения replica.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование с этим интервалом, в секундах.'
+        )
+
+    def handle(self, *args, target, interval, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Копирование реплики поддерживается только '
+                               'для SQLite.')
+        target = target or settings.DATABASES['replica']['NAME']
+        while True:
+            started = time.perf_counter()
+            self.sync(source, target)
+            self.stdout.write(
+                f'Реплика {target} обновлена за '
+                f'{(time.perf_counter() - started) * 1000:.0f} мс')
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def sync(source, target):
+        # Резервное копирование переносит согласованный снимок БД
+        # и берет блокировки, поэтому реплику читают и во время
+        # копирования; копия файла вместе с WAL могла бы быть
+        # несогласованной
+        source.ensure_connection()
+        destination = sqlite3.connect(target)
+        try:
+            source.connection.backup(destination)
+        finally:
+            destination.close()
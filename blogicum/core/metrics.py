@@ -0,0 +1,263 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Счетчики каждого процесса хранятся в отдельном файле METRICS_ROOT/<pid>,
+отображенном в память (mmap): запись в счетчик — изменение восьми байт
+без системных вызовов и обращений к БД. Эндпоинт /metrics суммирует
+файлы всех процессов, поэтому метрики собираются по всем процессам
+WSGI-сервера, в том числе уже завершенным. Каталог стоит размещать
+в tmpfs (например, /dev/shm) и очищать при развертывании.
+
+Формат файла: 8 байт — длина занятой части, далее записи из длины
+ключа (4 байта), ключа в UTF-8 с выравниванием до 8 байт и значения
+double (8 байт). Ключ — имя метрики с метками в формате Prometheus.
+"""
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+
+INITIAL_SIZE = 64 * 1024
+
+# Границы корзин гистограмм: время ответа в секундах и размер в байтах
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = tuple(2 ** power * 1024 for power in range(6, 16, 2))
+# Метка le среди меток ключа, без открывающей скобки
+LE_LABEL = re.compile(r'(?:^|,)le="([^"]*)"')
+
+HELP = {
+    'blogicum_http_requests_total': (
+        'counter', 'Число ответов по представлениям и статусам.'),
+    'blogicum_http_request_duration_seconds': (
+        'histogram', 'Время ответа представлений.'),
+    'blogicum_db_queries_total': (
+        'counter', 'Число SQL-запросов по представлениям.'),
+    'blogicum_db_query_duration_seconds_total': (
+        'counter', 'Время SQL-запросов по представлениям.'),
+    'blogicum_template_render_seconds_total': (
+        'counter', 'Время рендеринга шаблонов по представлениям.'),
+    'blogicum_cache_requests_total': (
+        'counter', 'Чтения из кэша по видам ключей и результату.'),
+    'blogicum_image_upload_bytes': (
+        'histogram', 'Размер загружаемых изображений.'),
+}
+
+
+def padded(length):
+    return length + (-length) % 8
+
+
+class MmapStore:
+    """Словарь «ключ — число» в файле, отображенном в память.
+
+    Пишет в файл только процесс-владелец; читать файл может любой
+    процесс функцией read_values().
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = struct.unpack_from('q', self.map, 0)[0] or 8
+        # Смещение значения каждого ключа; файл мог остаться от
+        # завершенного процесса с тем же pid
+        self.offsets = {
+            key: offset for key, _, offset in iter_entries(self.map)}
+
+    def add(self, key, amount):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self.append(key)
+            value = struct.unpack_from('d', self.map, offset)[0]
+            struct.pack_into('d', self.map, offset, value + amount)
+
+    def append(self, key):
+        encoded = key.encode('utf-8')
+        size = padded(4 + len(encoded)) + 8
+        if self.used + size > len(self.map):
+            new_size = max(len(self.map) * 2, self.used + size)
+            self.map.close()
+            self.file.truncate(new_size)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        struct.pack_into(f'i{len(encoded)}s', self.map, self.used,
+                         len(encoded), encoded)
+        offset = self.used + size - 8
+        struct.pack_into('d', self.map, offset, 0.0)
+        self.used += size
+        # Длина занятой части пишется последней: читатель не увидит
+        # записи, пока она не заполнена целиком
+        struct.pack_into('q', self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+
+def iter_entries(data):
+    """Записи файла метрик: (ключ, значение, смещение значения)."""
+    used = struct.unpack_from('q', data, 0)[0]
+    position = 8
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode('utf-8')
+        offset = position + padded(4 + length)
+        yield key, struct.unpack_from('d', data, offset)[0], offset
+        position = offset + 8
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Файл метрик текущего процесса; после fork у потомка свой файл."""
+    root = Path(settings.METRICS_ROOT)
+    key = (root, os.getpid())
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                root.mkdir(parents=True, exist_ok=True)
+                store = _stores[key] = MmapStore(root / str(os.getpid()))
+    return store
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def metric_key(name, labels):
+    if not labels:
+        return name
+    pairs = ','.join(f'{label}="{escape(value)}"'
+                     for label, value in sorted(labels.items()))
+    return f'{name}{{{pairs}}}'
+
+
+def inc(name, amount=1, **labels):
+    if settings.METRICS_ENABLED:
+        get_store().add(metric_key(name, labels), amount)
+
+
+def observe(name, value, buckets, **labels):
+    """Наблюдение гистограммы: корзины le, сумма и число наблюдений."""
+    if not settings.METRICS_ENABLED:
+        return
+    store = get_store()
+    # Нулевые корзины тоже записываются: ряды гистограммы появляются
+    # вместе, иначе rate() и histogram_quantile() видят новые ряды
+    # посреди наблюдений
+    for bound in buckets:
+        store.add(metric_key(f'{name}_bucket', {**labels, 'le': bound}),
+                  1 if value <= bound else 0)
+    store.add(metric_key(f'{name}_bucket', {**labels, 'le': '+Inf'}), 1)
+    store.add(metric_key(f'{name}_sum', labels), value)
+    store.add(metric_key(f'{name}_count', labels), 1)
+
+
+def read_values(root=None):
+    """Сумма значений метрик по файлам всех процессов."""
+    root = Path(root or settings.METRICS_ROOT)
+    totals = defaultdict(float)
+    if not root.is_dir():
+        return totals
+    for path in root.iterdir():
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < 8:
+            continue
+        for key, value, _ in iter_entries(data):
+            totals[key] += value
+    return totals
+
+
+def base_name(key):
+    name = key.split('{', 1)[0]
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in HELP:
+            return name[:-len(suffix)]
+    return name
+
+
+def format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def series_order(key):
+    """Порядок рядов: по меткам без le, затем корзины по возрастанию le."""
+    name, _, labels = key.partition('{')
+    match = LE_LABEL.search(labels)
+    if match is None:
+        return labels, name, 0.0
+    labels = (labels[:match.start()] + labels[match.end():]).lstrip(',')
+    # float('+Inf') — бесконечность, поэтому корзина +Inf последняя
+    return labels, name, float(match.group(1))
+
+
+def exposition(values):
+    """Текст в формате Prometheus: метрики сгруппированы по имени."""
+    groups = defaultdict(list)
+    for key in sorted(values):
+        groups[base_name(key)].append(key)
+    for keys in groups.values():
+        keys.sort(key=series_order)
+    lines = []
+    for name, keys in groups.items():
+        if name in HELP:
+            kind, help_text = HELP[name]
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+        lines.extend(f'{key} {format_value(values[key])}' for key in keys)
+    return '\n'.join(lines) + '\n'
+
+
+def key_kind(key):
+    """Вид ключа кэша для метки: второй сегмент ключа blog:<вид>:..."""
+    parts = str(key).split(':', 2)
+    return parts[1] if len(parts) > 2 and parts[0] == 'blog' else 'other'
+
+
+def instrument_caches():
+    """Подсчет попаданий и промахов в get() и get_many() бэкендов кэша.
+
+    Если бэкенд не переопределяет get_many(), тот вызывает get() для
+    каждого ключа, и считается только get().
+    """
+    missing = object()
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend.get, 'counted', False):
+            continue
+        get = backend.get
+
+        def counted_get(self, key, default=None, version=None, get=get):
+            value = get(self, key, missing, version)
+            hit = value is not missing
+            inc('blogicum_cache_requests_total', kind=key_kind(key),
+                result='hit' if hit else 'miss')
+            return value if hit else default
+
+        counted_get.counted = True
+        backend.get = counted_get
+        if backend.get_many is BaseCache.get_many:
+            continue
+        get_many = backend.get_many
+
+        def counted_get_many(self, keys, version=None, get_many=get_many):
+            keys = list(keys)
+            values = get_many(self, keys, version)
+            for key in keys:
+                inc('blogicum_cache_requests_total', kind=key_kind(key),
+                    result='hit' if key in values else 'miss')
+            return values
+
+        backend.get_many = counted_get_many
@@ -0,0 +1,155 @@
+import cProfile
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, nplusone, profiling, timing
+
+logger = logging.getLogger('blogicum.requests')
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestTimingMiddleware:
+    """Время SQL, шаблонов и всего запроса.
+
+    Для каждого запроса пишет в журнал blogicum.requests одну строку
+    JSON, а сотрудникам возвращает те же данные в заголовке
+    Server-Timing. Должен стоять первым в MIDDLEWARE, чтобы учитывать
+    работу остальных middleware. Для потоковых ответов время
+    отправки тела ответа не учитывается.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = timing.RequestTimings()
+        token = timing.current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            timing.current.reset(token)
+        total = timings.total()
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={milliseconds(timings.sql)}'
+                f';desc="SQL: {timings.queries}"',
+                f'tpl;dur={milliseconds(timings.template)}',
+                f'total;dur={milliseconds(total)}',
+            ))
+        if logger.isEnabledFor(logging.INFO):
+            match = request.resolver_match
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': timings.queries,
+                'db_ms': milliseconds(timings.sql),
+                'template_ms': milliseconds(timings.template),
+                'total_ms': milliseconds(total),
+            }, ensure_ascii=False))
+        return response
+
+
+class NPlusOneMiddleware:
+    """Поиск повторяющихся SQL-запросов (N+1) в пределах запроса.
+
+    Режим задается настройкой NPLUSONE_DETECTION: 'log' пишет
+    предупреждения в журнал blogicum.nplusone, 'raise' вызывает
+    NPlusOneError после обработки запроса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.NPLUSONE_DETECTION
+        if not mode:
+            return self.get_response(request)
+        counter = nplusone.QueryCounter(settings.NPLUSONE_THRESHOLD)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        nplusone.report(counter, mode == 'raise',
+                        prefix=f'{request.method} {request.path}: ')
+        return response
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса через cProfile.
+
+    Профилируются запросы сотрудников с заголовком PROFILING_HEADER
+    или параметром PROFILING_QUERY_PARAM (имя профиля возвращается
+    в заголовке X-Profile-Id) и, если задана PROFILING_SAMPLE_RATE,
+    один случайный запрос из PROFILING_SAMPLE_RATE. Должен стоять
+    после AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = profiling.requested(request)
+        if not (requested or profiling.sampled()):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        match = request.resolver_match
+        name = profiling.save_profile(
+            profiler, match.view_name if match else None)
+        if requested:
+            response['X-Profile-Id'] = name
+        return response
+
+
+class MetricsMiddleware:
+    """Счетчики и гистограммы запросов для /metrics.
+
+    Метки — имя представления (view_name), а не путь запроса, чтобы
+    число рядов не росло с числом страниц. Должен стоять после
+    RequestTimingMiddleware: оттуда берутся время SQL и шаблонов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.observe('blogicum_http_request_duration_seconds', duration,
+                        metrics.LATENCY_BUCKETS, view=view)
+        metrics.inc('blogicum_http_requests_total', view=view,
+                    method=request.method, status=response.status_code)
+        timings = timing.current.get()
+        if timings is not None:
+            metrics.inc('blogicum_db_queries_total', timings.queries,
+                        view=view)
+            metrics.inc('blogicum_db_query_duration_seconds_total',
+                        timings.sql, view=view)
+            metrics.inc('blogicum_template_render_seconds_total',
+                        timings.template, view=view)
+        return response
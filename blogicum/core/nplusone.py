@@ -0,0 +1,110 @@
+"""Обнаружение повторяющихся запросов вида N+1.
+
+Запрос, который выполняется много раз с разными параметрами, почти
+всегда означает ленивое обращение к связанной записи в цикле:
+например, post.author.username в шаблоне для выборки без
+select_related. Детектор сравнивает запросы по отпечатку (тексту SQL
+без параметров и со свернутыми списками IN) и при превышении порога
+сообщает строку шаблона и поле модели, из-за которых запрос выполнен.
+
+Детектор медленный (разбирает стек вызовов) и предназначен только
+для разработки и тестов.
+"""
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger('blogicum.nplusone')
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class NPlusOneError(AssertionError):
+    """Повторяющиеся запросы в пределах запроса или блока кода."""
+
+
+def fingerprint(sql):
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def find_origin():
+    """Поле модели и строка шаблона, из-за которых выполнен запрос."""
+    field = template = None
+    frame = sys._getframe(1)
+    while frame is not None and (field is None or template is None):
+        owner = frame.f_locals.get('self')
+        if field is None and owner is not None:
+            related = getattr(owner, 'field', None)
+            # Дескрипторы связей и менеджеры связанных записей
+            if (related is not None and hasattr(related, 'model')
+                    and frame.f_code.co_name in ('__get__', 'get_queryset',
+                                                 'get_object')):
+                field = f'{related.model.__name__}.{related.name}'
+        if (template is None and isinstance(owner, Node)
+                and frame.f_code.co_name == 'render_annotated'):
+            token = getattr(owner, 'token', None)
+            origin = getattr(owner, 'origin', None)
+            if token is not None and origin is not None:
+                template = f'{origin.template_name}:{token.lineno}'
+        frame = frame.f_back
+    return field, template
+
+
+class QueryCounter:
+    """Счетчик отпечатков запросов с местом первого повтора сверх порога."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        self.counts[key] += 1
+        if self.counts[key] == self.threshold:
+            self.origins[key] = find_origin()
+        return execute(sql, params, many, context)
+
+    def problems(self):
+        """Сообщения о запросах, повторенных не меньше порога раз."""
+        messages = []
+        for key, (field, template) in self.origins.items():
+            where = ', '.join(filter(None, (
+                field and f'поле {field}',
+                template and f'шаблон {template}',
+            ))) or 'место неизвестно'
+            messages.append(
+                f'Запрос выполнен {self.counts[key]} раз ({where}): {key}')
+        return messages
+
+
+@contextmanager
+def detect_n_plus_one(threshold=3, raise_error=True):
+    """Проверка блока кода на повторяющиеся запросы.
+
+    Пример для теста:
+
+        with detect_n_plus_one():
+            client.get('/')
+    """
+    counter = QueryCounter(threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+    report(counter, raise_error)
+
+
+def report(counter, raise_error, prefix=''):
+    problems = counter.problems()
+    if not problems:
+        return
+    if raise_error:
+        raise NPlusOneError('\n'.join([prefix + 'Запросы N+1:', *problems]))
+    for problem in problems:
+        logger.warning('%s%s', prefix, problem)
@@ -0,0 +1,146 @@
+"""Профилирование отдельных запросов через cProfile.
+
+Профиль сохраняется в PROFILING_ROOT двумя файлами: .pstats для pstats
+и snakeviz и .html со сводкой дерева вызовов. Имя файла содержит время,
+имя представления и pid процесса, поэтому профили можно группировать
+по представлениям, не открывая их. В каталоге хранится не больше
+PROFILING_MAX_FILES профилей: самые старые удаляются.
+"""
+import html
+import os
+import pstats
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+# Сводка показывает вызовы не глубже и не мельче этих порогов
+FLAME_MAX_DEPTH = 40
+FLAME_MIN_SHARE = 0.005
+
+
+def requested(request):
+    """Профилирование запрошено сотрудником заголовком или параметром."""
+    if not (request.GET.get(settings.PROFILING_QUERY_PARAM)
+            or request.headers.get(settings.PROFILING_HEADER)):
+        return False
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+def sampled():
+    """Выборочное профилирование одного запроса из PROFILING_SAMPLE_RATE."""
+    rate = settings.PROFILING_SAMPLE_RATE
+    return bool(rate) and random.randrange(rate) == 0
+
+
+def profile_name(view_name):
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%f')
+    view = (view_name or 'unknown').replace(':', '.')
+    return f'{stamp}-{view}-{os.getpid()}'
+
+
+def view_name(path):
+    """Имя представления из имени файла профиля."""
+    return path.stem.split('-', 1)[1].rsplit('-', 1)[0].replace('.', ':')
+
+
+def save_profile(profiler, view):
+    """Запись профиля в каталог и удаление лишних старых профилей."""
+    root = Path(settings.PROFILING_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    name = profile_name(view)
+    profiler.dump_stats(root / f'{name}.pstats')
+    stats = pstats.Stats(str(root / f'{name}.pstats'))
+    (root / f'{name}.html').write_text(
+        flame_html(stats, title=view or name), encoding='utf-8')
+    prune(root, settings.PROFILING_MAX_FILES)
+    return name
+
+
+def list_profiles(root=None):
+    """Файлы .pstats от старых к новым."""
+    root = Path(root or settings.PROFILING_ROOT)
+    if not root.is_dir():
+        return []
+    return sorted(root.glob('*.pstats'))
+
+
+def prune(root, max_files):
+    for path in list_profiles(root)[:-max_files or None]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.html').unlink(missing_ok=True)
+
+
+def function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({Path(filename).name}:{line})'
+
+
+def flame_html(stats, title):
+    """HTML-сводка дерева вызовов с долей общего времени у каждого узла.
+
+    Время ребра вызова берется из накопленного времени вызываемой
+    функции для этого вызывающего. Узлы мельче FLAME_MIN_SHARE
+    не показываются, а вызовы каждой функции раскрываются только
+    в первом ее вхождении: так сводка не растет
+    экспоненциально и конечна при рекурсии.
+    """
+    callees = {}
+    roots = []
+    for func, (_, _, _, cumulative, callers) in stats.stats.items():
+        if not callers:
+            roots.append((cumulative, func))
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((edge[3], func))
+            # Вызов из кода, начатого до включения профилировщика
+            if caller not in stats.stats:
+                roots.append((edge[3], func))
+    # Цепочка middleware вызывает сама себя, и у точки входа может не
+    # оказаться вызывающего вне профиля: она — функция с наибольшим
+    # накопленным временем.
+    top = max(stats.stats.items(), key=lambda item: item[1][3],
+              default=None)
+    if top is not None and top[0] not in {func for _, func in roots}:
+        roots.append((top[1][3], top[0]))
+    total = stats.total_tt or 1
+
+    expanded = set()
+
+    def render(func, cumulative, depth):
+        share = cumulative / total
+        label = html.escape(function_label(func))
+        summary = (
+            f'<summary><span class="bar" style="width:{share * 100:.1f}%">'
+            f'</span>{share:.1%} {cumulative * 1000:.1f} мс {label}'
+            f'</summary>'
+        )
+        children = []
+        if func not in expanded and depth < FLAME_MAX_DEPTH:
+            expanded.add(func)
+            children = [
+                render(child, child_time, depth + 1)
+                for child_time, child in sorted(callees.get(func, ()),
+                                                reverse=True)
+                if child_time / total >= FLAME_MIN_SHARE
+            ]
+        return (f'<details{" open" if share >= 0.1 else ""}>{summary}'
+                f'{"".join(children)}</details>')
+
+    tree = ''.join(
+        render(func, cumulative, 0)
+        for cumulative, func in sorted(roots, reverse=True)
+    )
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)}</title><style>'
+        'body{font:13px monospace}details{margin-left:1.5em}'
+        'summary{white-space:nowrap;position:relative}'
+        '.bar{position:absolute;left:0;top:0;bottom:0;'
+        'background:#fdd;z-index:-1}'
+        f'</style></head><body><h1>{html.escape(title)}</h1>'
+        f'<p>Всего {total * 1000:.1f} мс</p>{tree}</body></html>'
+    )
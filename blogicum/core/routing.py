@@ -0,0 +1,83 @@
+"""Чтение из реплики БД для представлений, которые только читают.
+
+Представления с ReplicaReadMixin выполняют запросы выборки через
+соединение READ_REPLICA (маршрутизатор ReplicaRouter смотрит на
+переменную контекста read_alias), остальные представления, формы
+и все записи работают с основной БД. Реплика отстает от основной БД,
+поэтому после записи (формы с WriteQueueMixin, регистрация, вход)
+пользователь читает из основной БД REPLICA_STICKY_SECONDS секунд:
+время хранится в его сессии. Так же из основной БД читаются
+страницы, данные которых изменились за это время: иначе кэш страниц
+и ETag получили бы новую версию со старым содержимым из реплики.
+
+Сессия и пользователь загружаются из основной БД до переключения на
+реплику: только что вошедший пользователь может отсутствовать в ней.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_SESSION_KEY = '_primary_until'
+
+read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """Маршрутизатор: чтение — из read_alias, запись — в основную БД."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный из реплики, сохраняется в основную БД
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема реплики копируется вместе с данными (sync_replica)
+        return db == DEFAULT_DB_ALIAS
+
+
+def sticky(request):
+    return request.session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def changed_recently(changed):
+    """Изменение (время в наносекундах) могло еще не дойти до реплики."""
+    return time.time_ns() - changed < settings.REPLICA_STICKY_SECONDS * 10**9
+
+
+def remember_write(request):
+    """Чтение из основной БД для пользователя после его записи."""
+    if settings.READ_REPLICA:
+        request.session[STICKY_SESSION_KEY] = (
+            time.time() + settings.REPLICA_STICKY_SECONDS)
+
+
+def remember_login(sender, request, **kwargs):
+    """Обработчик user_logged_in: вход записывает сессию и last_login."""
+    remember_write(request)
+
+
+@contextmanager
+def read_from_replica(request, changed=None):
+    """Чтение из реплики; changed — время изменения данных страницы."""
+    if not settings.READ_REPLICA or request.method not in ('GET', 'HEAD'):
+        yield
+        return
+    # Загрузка пользователя и сессии из основной БД
+    request.user.is_authenticated
+    if sticky(request) or (changed is not None
+                           and changed_recently(changed)):
+        yield
+        return
+    token = read_alias.set(settings.READ_REPLICA)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
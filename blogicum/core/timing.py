@@ -0,0 +1,72 @@
+"""Учет времени SQL-запросов и рендеринга шаблонов в пределах запроса.
+
+Счетчики текущего запроса хранятся в contextvars, поэтому вне
+RequestTimingMiddleware (в командах, миграциях) учет не ведется
+и обертки сводятся к одной проверке.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.template.base import Template
+
+current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Счетчики одного запроса; время хранится в секундах."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        # Вложенные шаблоны (include, extends, формы bootstrap)
+        # учитываются временем самого внешнего
+        self.template_depth = 0
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """Обертка connection.execute_wrapper: число и время запросов."""
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.sql += time.perf_counter() - started
+
+
+def instrument_templates():
+    """Замер рендеринга шаблонов без учета SQL-запросов внутри него.
+
+    Ленивые выборки выполняются при рендеринге, но их время уже учтено
+    как время SQL: так время БД, шаблонов и остального кода
+    представления в сумме не превышает время запроса.
+    """
+    if getattr(Template.render, 'timed', False):
+        return
+    render = Template.render
+
+    @wraps(render)
+    def timed_render(self, context):
+        timings = current.get()
+        if timings is None or timings.template_depth:
+            return render(self, context)
+        timings.template_depth += 1
+        started = time.perf_counter()
+        sql_before = timings.sql
+        try:
+            return render(self, context)
+        finally:
+            timings.template_depth -= 1
+            timings.template += (time.perf_counter() - started
+                                 - (timings.sql - sql_before))
+
+    timed_render.timed = True
+    Template.render = timed_render
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+from . import metrics
+
+
+@require_safe
+def metrics_view(request):
+    """Метрики всех процессов приложения в формате Prometheus."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        metrics.exposition(metrics.read_values()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
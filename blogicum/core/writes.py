@@ -0,0 +1,144 @@
+"""Очередь записи в SQLite: один пишущий поток на процесс или на сервер.
+
+SQLite допускает одну пишущую транзакцию за раз, и при всплеске
+записей из нескольких процессов они ждут блокировку и могут не
+дождаться ее (busy_timeout). С включенной настройкой SQLITE_WRITE_QUEUE
+обработчики записи передаются в поток записи процесса, а вызывающий
+поток ждет результата и получает его значение или исключение, как при
+прямом вызове. Сигналы, меняющие кэш, повторяют изменение после
+фиксации транзакции (transaction.on_commit).
+
+Поток записи выполняет накопившиеся обработчики группой в одной
+транзакции (групповая фиксация), каждый — в своей точке сохранения:
+ошибка одного обработчика откатывает только его изменения. Результаты
+возвращаются после фиксации транзакции. В режиме 'host' на время
+транзакции берется блокировка файла SQLITE_WRITE_LOCK_FILE, поэтому
+процессы сервера пишут по очереди, не соревнуясь за блокировку SQLite.
+
+Записи вне очереди (вход пользователя, админка, команды) по-прежнему
+полагаются на busy_timeout.
+"""
+import fcntl
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+
+
+@contextmanager
+def host_lock():
+    """Эксклюзивная блокировка файла, общая для процессов сервера."""
+    if settings.SQLITE_WRITE_QUEUE != 'host':
+        yield
+        return
+    with open(settings.SQLITE_WRITE_LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class WriteQueue:
+    """Очередь обработчиков записи и поток, который их выполняет."""
+
+    def __init__(self):
+        self.tasks = queue.Queue()
+        self.thread = None
+        self.pid = None
+        self.start_lock = threading.Lock()
+        # Число выполненных групп, для тестов и замеров
+        self.batches = 0
+
+    def submit(self, func):
+        future = Future()
+        self.ensure_thread()
+        self.tasks.put((func, future))
+        return future
+
+    def ensure_thread(self):
+        # После fork поток родителя в процессе-потомке не работает
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.thread is None or self.pid != os.getpid():
+                self.tasks = queue.Queue()
+                self.pid = os.getpid()
+                self.thread = threading.Thread(
+                    target=self.work, name='sqlite-writer', daemon=True)
+                self.thread.start()
+
+    def work(self):
+        while True:
+            batch = [self.tasks.get()]
+            deadline = time.monotonic() + settings.SQLITE_WRITE_BATCH_WAIT
+            while len(batch) < settings.SQLITE_WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.tasks.get(
+                        timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self.commit(batch)
+
+    @staticmethod
+    def run_batch(batch):
+        """Обработчики группы, каждый в своей точке сохранения."""
+        outcomes = []
+        for func, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with transaction.atomic():
+                    outcomes.append((future, func(), None))
+            except Exception as error:
+                outcomes.append((future, None, error))
+        return outcomes
+
+    def commit(self, batch):
+        try:
+            with host_lock(), transaction.atomic():
+                outcomes = self.run_batch(batch)
+        except Exception as error:
+            # Транзакция не зафиксирована: ошибка у всех обработчиков
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            self.batches += 1
+            connection.close_if_unusable_or_obsolete()
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+write_queue = WriteQueue()
+
+
+def run(func):
+    """Выполнение обработчика записи в транзакции, через очередь, если
+    она включена.
+
+    Если очередь не дошла до обработчика за SQLITE_WRITE_TIMEOUT секунд,
+    он отменяется и вызывающий поток получает TimeoutError: запись
+    не выполнится. Уже начатый обработчик отменить нельзя, поэтому
+    результат ждется до конца выполнения.
+    """
+    if (not settings.SQLITE_WRITE_QUEUE
+            or threading.current_thread() is write_queue.thread):
+        with transaction.atomic():
+            return func()
+    future = write_queue.submit(func)
+    try:
+        return future.result(timeout=settings.SQLITE_WRITE_TIMEOUT)
+    except TimeoutError:
+        if future.cancel():
+            raise
+    return future.result()
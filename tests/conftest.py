@@ -41,6 +41,13 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -367,3 +374,20 @@ def cleanup(request):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+
+
+@pytest.fixture(autouse=True)
+def raise_on_n_plus_one():
+    with override_settings(NPLUSONE_DETECTION='raise'):
+        yield
+
+
+@pytest.fixture(scope='session')
+def metrics_root(tmp_path_factory):
+    return tmp_path_factory.mktemp('metrics')
+
+
+@pytest.fixture(autouse=True)
+def isolated_metrics(metrics_root):
+    with override_settings(METRICS_ROOT=metrics_root):
+        yield
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    start = timezone.now() - timedelta(days=1)
+    return [
+        mixer.blend('blog.Post', author=user, category=published_category,
+                    location=published_location, is_published=True,
+                    pub_date=start + timedelta(minutes=number))
+        for number in range(12)
+    ]
+
+
+def test_api_posts(client, posts, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = client.get('/api/posts/')
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [item['id'] for item in data['results']] == [
+        post.pk for post in reversed(posts)][:10], (
+        'Убедитесь, что API возвращает посты в порядке публикации.'
+    )
+    first = data['results'][0]
+    assert first['author'] == posts[-1].author.username
+    assert first['location'] == posts[-1].location.name
+    assert first['comment_count'] == 0
+
+    next_page = client.get(data['next']).json()
+    assert [item['id'] for item in next_page['results']] == [
+        posts[1].pk, posts[0].pk], (
+        'Убедитесь, что API разбивает список на страницы курсором.'
+    )
+    assert next_page['next'] is None
+
+
+def test_api_sparse_fields(client, posts):
+    data = client.get('/api/posts/', {'fields': 'id,title'}).json()
+    assert set(data['results'][0]) == {'id', 'title'}, (
+        'Убедитесь, что параметр fields ограничивает поля ответа.'
+    )
+    response = client.get('/api/posts/', {'fields': 'id,password'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_api_visibility(client, user_client, user, posts, published_category):
+    hidden = posts[-1]
+    hidden.is_published = False
+    hidden.save()
+    ids = [item['id'] for item in client.get('/api/posts/').json()['results']]
+    assert hidden.pk not in ids, (
+        'Убедитесь, что API не показывает снятые с публикации посты.'
+    )
+    url = f'/api/profile/{user.username}/'
+    assert hidden.pk not in [
+        item['id'] for item in client.get(url).json()['results']]
+    assert hidden.pk in [
+        item['id'] for item in user_client.get(url).json()['results']], (
+        'Убедитесь, что автор видит в API свои скрытые посты.'
+    )
+    comments_url = f'/api/posts/{hidden.pk}/comments/'
+    assert client.get(comments_url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(comments_url).status_code == HTTPStatus.OK
+
+    published_category.is_published = False
+    published_category.save()
+    response = client.get(f'/api/category/{published_category.slug}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_api_comments(client, mixer, user, posts):
+    post = posts[0]
+    comments = mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    response = client.get(f'/api/posts/{post.pk}/comments/')
+    assert [item['id'] for item in response.json()['results']] == [
+        comment.pk for comment in comments]
+    etag = response['ETag']
+    response = client.get(f'/api/posts/{post.pk}/comments/',
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что API поддерживает условные запросы.'
+    )
+
+
+def test_api_invalid_cursor(client, posts):
+    response = client.get('/api/posts/', {'cursor': 'broken'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
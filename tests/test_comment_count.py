@@ -0,0 +1,85 @@
+import pytest
+from django.core import serializers
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.models import Comment, Post
+from blog.querysets import post_query
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_count(post):
+    return Post.objects.values_list('comment_count', flat=True).get(
+        pk=post.pk)
+
+
+def test_comment_count_follows_views(
+        user, user_client, post_with_published_location):
+    post = post_with_published_location
+    for number in range(3):
+        user_client.post(f'/posts/{post.id}/comment/',
+                         {'text': f'Комментарий {number}'})
+    assert _stored_count(post) == 3, (
+        'Убедитесь, что при создании комментария увеличивается'
+        ' поле `comment_count` публикации.'
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert _stored_count(post) == 2, (
+        'Убедитесь, что при удалении комментария уменьшается'
+        ' поле `comment_count` публикации.'
+    )
+
+
+def test_comment_count_moved_comment(mixer, post_with_published_location,
+                                     post_of_another_author):
+    comment = mixer.blend('blog.Comment', post=post_with_published_location)
+    comment.post = post_of_another_author
+    comment.save()
+    assert _stored_count(post_with_published_location) == 0
+    assert _stored_count(post_of_another_author) == 1, (
+        'Убедитесь, что при переносе комментария в другую публикацию'
+        ' счетчики обеих публикаций обновляются.'
+    )
+
+
+def test_rebuild_comment_count(mixer, post_with_published_location):
+    mixer.cycle(4).blend('blog.Comment', post=post_with_published_location)
+    Post.objects.update(comment_count=0)
+    call_command('rebuild_comment_count', verbosity=0)
+    assert _stored_count(post_with_published_location) == 4, (
+        'Убедитесь, что команда `rebuild_comment_count` пересчитывает'
+        ' поле `comment_count` по таблице комментариев.'
+    )
+
+
+def test_loaddata_keeps_comment_count(
+        tmp_path, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    fixture = tmp_path / 'blog.json'
+    fixture.write_text(serializers.serialize(
+        'json', [Post.objects.get(pk=post.pk), comment]))
+    comment.delete()
+    call_command('loaddata', str(fixture), verbosity=0)
+    assert _stored_count(post) == 1, (
+        'Убедитесь, что при загрузке фикстур комментарии не учитываются'
+        ' повторно: `comment_count` уже хранится в фикстуре.'
+    )
+
+
+@pytest.mark.parametrize('use_column', [True, False])
+def test_comment_count_switch(mixer, post_with_published_location,
+                              use_column):
+    mixer.cycle(2).blend('blog.Comment', post=post_with_published_location)
+    with override_settings(POSTS_COMMENT_COUNT_COLUMN=use_column):
+        queryset = post_query(Post.objects)
+        post = queryset.get(pk=post_with_published_location.pk)
+        sql = str(queryset.query).upper()
+    assert post.comments_number == 2
+    assert ('GROUP BY' not in sql) == use_column, (
+        'Убедитесь, что при включенной настройке POSTS_COMMENT_COUNT_COLUMN'
+        ' лента не агрегирует комментарии.'
+    )
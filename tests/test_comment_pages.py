@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_NUMBER = 20
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_NUMBER * 2 + 5).blend(
+        'blog.Comment', post=post_with_published_location)
+
+
+def _comment_ids(content):
+    return [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def test_comments_are_loaded_in_batches(client, post_with_published_location,
+                                        many_comments):
+    post = post_with_published_location
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    expected = [comment.id for comment in many_comments]
+    assert _comment_ids(content) == expected[:COMMENTS_NUMBER], (
+        'Убедитесь, что на странице поста выводятся только первые'
+        f' {COMMENTS_NUMBER} комментариев в порядке добавления.'
+    )
+
+    seen = _comment_ids(content)
+    next_url = re.search(r'href="(/posts/\d+/comments/\?cursor=[^"]+)"',
+                         content)
+    while next_url:
+        content = client.get(next_url.group(1)).content.decode()
+        seen += _comment_ids(content)
+        next_url = re.search(
+            r'href="(/posts/\d+/comments/\?cursor=[^"]+)"', content)
+    assert seen == expected, (
+        'Убедитесь, что по ссылке подгрузки комментариев выводятся'
+        ' все оставшиеся комментарии без повторов.'
+    )
+
+
+def test_comments_json(client, post_with_published_location, many_comments):
+    url = f'/posts/{post_with_published_location.id}/comments/'
+    data = client.get(url, {'format': 'json'}).json()
+    assert len(data['comments']) == COMMENTS_NUMBER
+    data = client.get(
+        url, {'format': 'json', 'cursor': data['next_cursor']}).json()
+    assert [item['id'] for item in data['comments']] == [
+        comment.id for comment in many_comments[COMMENTS_NUMBER:]
+    ][:COMMENTS_NUMBER], (
+        'Убедитесь, что JSON-ответ со списком комментариев выдает'
+        ' следующую порцию по курсору.'
+    )
+
+
+def test_comments_of_hidden_post(another_user_client, user_client, mixer,
+                                 user):
+    post = mixer.blend('blog.Post', author=user, is_published=False)
+    url = f'/posts/{post.id}/comments/'
+    assert another_user_client.get(url).status_code == 404, (
+        'Убедитесь, что комментарии снятой с публикации записи'
+        ' недоступны другим пользователям.'
+    )
+    assert user_client.get(url).status_code == 200
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True, location=None,
+                       pub_date=timezone.now())
+
+
+@pytest.mark.parametrize('url', (
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.pk}/',
+))
+def test_not_modified(client, post, django_assert_num_queries, url):
+    url = url.format(post=post)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    etag = response['ETag']
+    assert response['Last-Modified']
+
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении If-None-Match страница не строится'
+        ' заново и возвращается код 304.'
+    )
+    assert response['ETag'] == etag
+
+
+def test_etag_changes_on_write(client, mixer, user, post):
+    url = f'/posts/{post.pk}/'
+    etag = client.get(url)['ETag']
+    mixer.blend('blog.Comment', post=post, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что после добавления комментария страница поста'
+        ' отдается заново.'
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_etag_depends_on_user(client, user_client, post):
+    anonymous = client.get('/')
+    response = user_client.get('/', HTTP_IF_NONE_MATCH=anonymous['ETag'])
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ETag страницы зависит от пользователя.'
+    )
+    assert not response.has_header('Last-Modified')
+    assert 'private' in response['Cache-Control']
+    response = user_client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_etag_changes_on_login(client, user, post):
+    url = f'/posts/{post.pk}/'
+    client.force_login(user)
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    client.logout()
+    client.force_login(user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что после повторного входа страница с формой'
+        ' отдается заново: CSRF-токен в сохраненной странице устарел.'
+    )
+
+
+@pytest.mark.parametrize('url', (
+    '/posts/9999/', '/category/missing/', '/profile/missing/',
+    '/api/posts/9999/comments/', '/api/category/missing/',
+    '/api/profile/missing/', '/category/missing/feed/atom/',
+    '/profile/missing/feed/atom/'))
+@pytest.mark.parametrize('headers', (
+    {'HTTP_IF_NONE_MATCH': '*'},
+    {'HTTP_IF_MODIFIED_SINCE': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+))
+def test_missing_object_not_modified(client, post, url, headers):
+    assert client.get(url, **headers).status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что ответ 304 не отправляется по адресу'
+        ' отсутствующего объекта.'
+    )
+
+
+def test_deleted_post_not_modified(client, post):
+    url = f'/posts/{post.pk}/'
+    client.get(url)
+    post.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == HTTPStatus.NOT_FOUND
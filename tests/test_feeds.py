@@ -0,0 +1,106 @@
+import json
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, location=None, pub_date=timezone.now())
+
+
+def _content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+@pytest.mark.parametrize('url', (
+    '/feed/atom/',
+    '/category/{post.category.slug}/feed/atom/',
+    '/profile/{post.author.username}/feed/atom/',
+))
+def test_atom_feed(client, posts, url):
+    response = client.get(url.format(post=posts[0]))
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('application/atom+xml')
+    feed = ElementTree.fromstring(_content(response))
+    titles = {entry.find(f'{ATOM}title').text
+              for entry in feed.iter(f'{ATOM}entry')}
+    assert titles == {post.title for post in posts}, (
+        'Убедитесь, что лента Atom содержит опубликованные посты.'
+    )
+
+
+def test_json_feed(client, posts):
+    response = client.get('/feed/json/')
+    assert response.status_code == HTTPStatus.OK
+    feed = json.loads(_content(response))
+    assert feed['version'] == 'https://jsonfeed.org/version/1.1'
+    assert [item['title'] for item in feed['items']] == [
+        post.title for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.pk), reverse=True)
+    ], 'Убедитесь, что JSON Feed содержит посты в порядке публикации.'
+
+
+def test_feed_hides_unpublished(client, posts):
+    hidden = posts[0]
+    hidden.is_published = False
+    hidden.save()
+    assert hidden.title not in _content(client.get('/feed/json/')), (
+        'Убедитесь, что в ленту не попадают снятые с публикации посты.'
+    )
+
+
+def test_feed_cache(client, posts, django_assert_num_queries):
+    content = _content(client.get('/feed/atom/'))
+    with django_assert_num_queries(0):
+        response = client.get('/feed/atom/')
+    assert _content(response) == content, (
+        'Убедитесь, что повторный запрос ленты обслуживается из кэша.'
+    )
+    with django_assert_num_queries(0):
+        response = client.get('/feed/atom/',
+                              HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    posts[0].title = 'Новый заголовок'
+    posts[0].save()
+    assert 'Новый заголовок' in _content(client.get('/feed/atom/')), (
+        'Убедитесь, что изменение поста сбрасывает кэш ленты.'
+    )
+
+
+def test_feed_cache_expires(client, posts, settings, monkeypatch):
+    from blog import feeds
+    timeouts = []
+    cache_set = feeds.cache.set
+
+    def record_set(key, value, timeout=None, **kwargs):
+        if key.startswith('blog:feed:'):
+            timeouts.append(timeout)
+        return cache_set(key, value, timeout, **kwargs)
+
+    monkeypatch.setattr(feeds.cache, 'set', record_set)
+    _content(client.get('/feed/json/'))
+    assert timeouts == [settings.PAGE_CACHE_TIMEOUT], (
+        'Убедитесь, что текст ленты хранится в кэше PAGE_CACHE_TIMEOUT'
+        ' секунд: прежние версии ленты не должны копиться в кэше.'
+    )
+
+
+@pytest.mark.parametrize('url', (
+    '/feed/rss/',
+    '/category/unknown/feed/atom/',
+    '/profile/unknown/feed/json/',
+))
+def test_feed_not_found(client, url):
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from blog.models import Category, Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+OPTIONS = {
+    'users': 20, 'categories': 4, 'locations': 5, 'posts': 200,
+    'comments': 300, 'viral': 1, 'viral_comments': 150,
+    'batch_size': 64, 'verbosity': 0,
+}
+
+
+def _snapshot():
+    """Данные без ключей и дат, которые зависят от БД и времени запуска."""
+    first_post = Post.objects.order_by('pk').first().pk
+    return (
+        list(User.objects.order_by('pk').values_list('first_name',
+                                                     'last_name')),
+        list(Post.objects.order_by('pk').values_list(
+            'title', 'is_published', 'comment_count')),
+        [(post - first_post, text) for post, text in
+         Comment.objects.order_by('pk').values_list('post', 'text')],
+    )
+
+
+def test_generate_blog_data():
+    call_command('generate_blog_data', seed=1, **OPTIONS)
+    assert User.objects.count() == OPTIONS['users']
+    assert Post.objects.count() == OPTIONS['posts']
+    assert Comment.objects.count() == (
+        OPTIONS['comments'] + OPTIONS['viral'] * OPTIONS['viral_comments'])
+    top = Post.objects.order_by('-comment_count').first()
+    assert top.comment_count == top.comments.count() >= 150, (
+        'Убедитесь, что у популярной публикации есть все ее комментарии'
+        ' и что число комментариев пересчитано.'
+    )
+    assert top.is_visible
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(is_visible=False, is_published=True).exists()
+    assert Post.objects.values('author').annotate(
+        number=Count('id')).count() > 1
+
+
+def test_generate_blog_data_existing_names(mixer):
+    # Имена, совпадающие с шаблоном сгенерированных данных
+    User.objects.create(username='user5')
+    mixer.blend('blog.Category', slug='category-3')
+    call_command('generate_blog_data', seed=1, **OPTIONS)
+    assert User.objects.count() == OPTIONS['users'] + 1, (
+        'Убедитесь, что генерация данных не создает пользователей с уже'
+        ' занятыми именами.'
+    )
+    assert Category.objects.count() == OPTIONS['categories'] + 1
+
+
+def test_generate_blog_data_seed():
+    call_command('generate_blog_data', seed=5, **OPTIONS)
+    first = _snapshot()
+    for model in (Comment, Post, User):
+        model.objects.all().delete()
+    call_command('generate_blog_data', seed=5, **OPTIONS)
+    assert _snapshot() == first, (
+        'Убедитесь, что одинаковое зерно дает одинаковые данные.'
+    )
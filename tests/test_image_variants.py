@@ -0,0 +1,99 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from blog import images
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media(settings, tmp_path, monkeypatch):
+    # Объем кэша копий, учтенный процессом, относится к прежнему каталогу
+    monkeypatch.setattr(images, 'cache_size', images.VariantCacheSize())
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.IMAGE_VARIANT_ROOT = tmp_path / 'cache'
+    (settings.MEDIA_ROOT / 'post_images').mkdir(parents=True)
+    Image.new('RGB', (2000, 1000), (10, 150, 90)).save(
+        settings.MEDIA_ROOT / 'post_images' / 'photo.jpg', 'JPEG')
+    return settings
+
+
+def _variant_size(response):
+    content = b''.join(response.streaming_content)
+    with Image.open(BytesIO(content)) as image:
+        return image.size
+
+
+def test_image_variant(client, media):
+    url = '/media/resized/640x640/post_images/photo.jpg'
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert _variant_size(response) == (640, 320), (
+        'Убедитесь, что уменьшенная копия вписывается в запрошенный размер.'
+    )
+    etag = response['ETag']
+    assert etag.startswith('"'), 'Убедитесь, что ETag копии строгий.'
+    assert 'max-age=31536000' in response['Cache-Control']
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении If-None-Match возвращается код 304.'
+    )
+    assert len(list(media.IMAGE_VARIANT_ROOT.glob('*/*'))) == 1
+
+
+@pytest.mark.parametrize('url', (
+    '/media/resized/641x641/post_images/photo.jpg',
+    '/media/resized/640x640/post_images/missing.jpg',
+    '/media/resized/640x640/../../etc/passwd',
+))
+def test_image_variant_not_found(client, media, url):
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что недопустимый размер или путь возвращают код 404.'
+    )
+
+
+def test_image_variant_cache_eviction(client, media):
+    media.IMAGE_VARIANT_CACHE_MAX_SIZE = 1
+    for size in ('320x320', '640x640'):
+        client.get(f'/media/resized/{size}/post_images/photo.jpg')
+    assert len(list(media.IMAGE_VARIANT_ROOT.glob('*/*'))) == 1, (
+        'Убедитесь, что дисковый кэш копий не превышает'
+        ' IMAGE_VARIANT_CACHE_MAX_SIZE.'
+    )
+
+
+def test_image_variant_cache_scanned_rarely(client, media, monkeypatch):
+    scans = []
+    evict = images.evict_image_variants
+    monkeypatch.setattr(images, 'evict_image_variants',
+                        lambda keep=None: scans.append(keep) or evict(keep))
+    for size in ('320x320', '640x640', '1280x1280'):
+        client.get(f'/media/resized/{size}/post_images/photo.jpg')
+    assert len(scans) == 1, (
+        'Убедитесь, что каталог кэша копий не обходится при каждом'
+        ' создании копии, пока лимит объема не превышен.'
+    )
+
+
+def test_evict_image_variants_command(client, media):
+    client.get('/media/resized/320x320/post_images/photo.jpg')
+    media.IMAGE_VARIANT_CACHE_MAX_SIZE = 0
+    call_command('evict_image_variants', stdout=None)
+    assert not list(media.IMAGE_VARIANT_ROOT.glob('*/*')), (
+        'Убедитесь, что команда `evict_image_variants` удаляет копии'
+        ' сверх IMAGE_VARIANT_CACHE_MAX_SIZE.'
+    )
+
+
+def test_post_card_srcset(client, media, post_with_published_location):
+    post_with_published_location.image = 'post_images/photo.jpg'
+    post_with_published_location.save()
+    content = client.get('/').content.decode()
+    assert 'srcset="/media/resized/320x320/post_images/photo.jpg 320w' in (
+        content), 'Убедитесь, что в карточке поста указан srcset.'
+    assert 'loading="lazy"' in content
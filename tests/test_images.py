@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.forms import PostForm
+
+pytestmark = [pytest.mark.django_db]
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+def _camera_jpeg(size=(4000, 3000), orientation=6):
+    image = Image.new('RGB', size, color=(200, 120, 40))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = orientation
+    exif[EXIF_MAKE] = 'Camera'
+    output = BytesIO()
+    image.save(output, 'JPEG', quality=95, exif=exif)
+    return SimpleUploadedFile(
+        'IMG_0001.JPG', output.getvalue(), content_type='image/jpeg')
+
+
+def _post_form(category, upload):
+    return PostForm(
+        data={
+            'title': 'Фото',
+            'text': 'Текст',
+            'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+            'category': category.pk,
+            'is_published': True,
+        },
+        files={'image': upload},
+    )
+
+
+def test_uploaded_image_is_processed(published_category):
+    upload = _camera_jpeg()
+    form = _post_form(published_category, upload)
+    assert form.is_valid(), form.errors
+    image_file = form.cleaned_data['image']
+    with Image.open(image_file) as image:
+        assert max(image.size) <= 1600, (
+            'Убедитесь, что загруженное изображение уменьшается'
+            ' до POST_IMAGE_MAX_SIZE.'
+        )
+        assert image.size[0] < image.size[1], (
+            'Убедитесь, что изображение поворачивается по EXIF-ориентации.'
+        )
+        assert not image.getexif(), (
+            'Убедитесь, что из изображения удаляются метаданные EXIF.'
+        )
+        assert image.info.get('progressive'), (
+            'Убедитесь, что изображение сохраняется как progressive JPEG.'
+        )
+    assert image_file.size < upload.size
+    assert image_file.name.endswith('.jpg') and 'IMG' not in image_file.name
+
+
+@override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=1024)
+def test_upload_size_limit(published_category):
+    form = _post_form(published_category, _camera_jpeg(size=(800, 600)))
+    assert not form.is_valid() and 'image' in form.errors, (
+        'Убедитесь, что слишком большие файлы изображений отклоняются.'
+    )
+
+
+@override_settings(POST_IMAGE_FORMAT='WEBP')
+def test_webp_output(published_category):
+    form = _post_form(published_category, _camera_jpeg(size=(800, 600)))
+    assert form.is_valid(), form.errors
+    with Image.open(form.cleaned_data['image']) as image:
+        assert image.format == 'WEBP'
@@ -0,0 +1,121 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, User
+from blog.querysets import posts_search
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / 'blogicum' / 'db.json'
+
+
+@pytest.fixture
+def blog_data(mixer, user, published_category, published_location):
+    created_at = timezone.now() - timedelta(days=30)
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    Post.objects.filter(pk=posts[0].pk).update(created_at=created_at)
+    mixer.cycle(2).blend('blog.Comment', post=posts[0], author=user,
+                         text='Комментарий про котов')
+    return posts
+
+
+def _load(path, **options):
+    call_command('import_blog', str(path), verbosity=0, **options)
+
+
+@pytest.mark.parametrize('fmt', ['json', 'jsonl'])
+def test_export_import_roundtrip(tmp_path, blog_data, fmt):
+    path = tmp_path / f'blog.{fmt}'
+    call_command('export_blog', str(path), chunk_size=2, verbosity=0)
+    if fmt == 'json':
+        records = json.loads(path.read_text(encoding='utf-8'))
+    else:
+        records = [json.loads(line) for line in
+                   path.read_text(encoding='utf-8').splitlines()]
+    assert {record['model'] for record in records} == {
+        'auth.user', 'blog.category', 'blog.location', 'blog.post',
+        'blog.comment'}
+    post_record = next(r for r in records if r['model'] == 'blog.post')
+    assert 'comment_count' not in post_record['fields'], (
+        'Убедитесь, что вычисляемые поля не выгружаются.'
+    )
+    assert isinstance(post_record['fields']['author'], int)
+
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    _load(path, batch_size=2)
+    assert Post.objects.count() == len(blog_data)
+    assert User.objects.count() == 1, (
+        'Убедитесь, что пользователи с тем же именем не дублируются.'
+    )
+    first = Post.objects.get(title=blog_data[0].title)
+    assert first.created_at < timezone.now() - timedelta(days=29), (
+        'Убедитесь, что при загрузке сохраняется дата создания из файла.'
+    )
+    assert first.comment_count == 2
+    assert first.is_visible
+    assert posts_search(Post.objects, 'кот*').get() == first, (
+        'Убедитесь, что после загрузки перестраивается поисковый индекс.'
+    )
+
+
+def test_import_db_json():
+    _load(DB_JSON, batch_size=7)
+    records = json.loads(DB_JSON.read_text(encoding='utf-8'))
+    for label, model in (('blog.post', Post), ('blog.comment', Comment),
+                         ('blog.category', Category)):
+        assert model.objects.count() == sum(
+            record['model'] == label for record in records), (
+            'Убедитесь, что import_blog загружает db.json, в котором'
+            ' пользователи идут после публикаций.'
+        )
+    Comment.objects.create(post=Post.objects.first(), text='Проверка',
+                           author=User.objects.first())
+    assert Post.objects.filter(search__match='проверка*').exists(), (
+        'Убедитесь, что триггеры поискового индекса работают после загрузки.'
+    )
+
+
+def test_import_forward_references(tmp_path):
+    post_fields = {'text': 'Текст', 'pub_date': '2024-01-01T00:00:00Z',
+                   'is_published': True, 'category': 1, 'location': 7,
+                   'created_at': '2024-01-01T00:00:00Z'}
+    records = [
+        {'model': 'blog.comment', 'pk': 1, 'fields': {
+            'text': 'К удаленному автору', 'post': 1, 'author': 1,
+            'created_at': '2024-01-01T00:00:00Z'}},
+        {'model': 'blog.post', 'pk': 1, 'fields': {
+            **post_fields, 'title': 'Без автора', 'author': 5}},
+        {'model': 'blog.post', 'pk': 2, 'fields': {
+            **post_fields, 'title': 'С автором', 'author': 1}},
+        {'model': 'auth.user', 'pk': 1, 'fields': {
+            'username': 'author', 'password': '!'}},
+        {'model': 'blog.category', 'pk': 1, 'fields': {
+            'title': 'Категория', 'description': 'Описание', 'slug': 'cat',
+            'is_published': True, 'created_at': '2024-01-01T00:00:00Z'}},
+    ]
+    path = tmp_path / 'forward.jsonl'
+    path.write_text('\n'.join(json.dumps(record) for record in records),
+                    encoding='utf-8')
+    _load(path, batch_size=1)
+    post = Post.objects.get()
+    assert post.title == 'С автором' and post.location is None, (
+        'Убедитесь, что записи со ссылками на записи дальше по файлу'
+        ' загружаются, а записи без связанных записей пропускаются.'
+    )
+    assert not Comment.objects.exists()
+
+
+def test_import_invalid_file(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('{"model": "blog.post"}', encoding='utf-8')
+    with pytest.raises(CommandError):
+        _load(path)
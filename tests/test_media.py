@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / 'post_images').mkdir()
+    (tmp_path / 'post_images' / 'photo.jpg').write_bytes(CONTENT)
+    (tmp_path / 'post_images' / '0123456789abcdef0123.jpg').write_bytes(
+        CONTENT)
+    return settings
+
+
+def _content(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_conditional_get(client, media):
+    response = client.get('/media/post_images/photo.jpg')
+    assert response.status_code == HTTPStatus.OK
+    assert _content(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    response = client.get('/media/post_images/photo.jpg',
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении If-None-Match возвращается код 304.'
+    )
+    response = client.get('/media/post_images/photo.jpg',
+                          HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что If-Modified-Since учитывается при отдаче файлов.'
+    )
+
+
+@pytest.mark.parametrize('header, expected', (
+    ('bytes=0-9', CONTENT[:10]),
+    ('bytes=1000-', CONTENT[1000:]),
+    ('bytes=-24', CONTENT[-24:]),
+    ('bytes=1020-5000', CONTENT[1020:]),
+))
+def test_media_range(client, media, header, expected):
+    response = client.get('/media/post_images/photo.jpg', HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        'Убедитесь, что запрос диапазона байтов получает код 206.'
+    )
+    assert _content(response) == expected
+    assert response['Content-Range'].endswith(f'/{len(CONTENT)}')
+
+
+def test_media_range_not_satisfiable(client, media):
+    response = client.get('/media/post_images/photo.jpg',
+                          HTTP_RANGE='bytes=5000-')
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+def test_media_stale_if_range(client, media):
+    response = client.get('/media/post_images/photo.jpg',
+                          HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что при несовпадении If-Range файл отдается целиком.'
+    )
+
+
+def test_media_cache_control(client, media):
+    hashed = client.get('/media/post_images/0123456789abcdef0123.jpg')
+    assert 'immutable' in hashed['Cache-Control'], (
+        'Убедитесь, что файлы с хэшем содержимого в имени кэшируются'
+        ' браузером надолго.'
+    )
+    plain = client.get('/media/post_images/photo.jpg')
+    assert 'immutable' not in plain['Cache-Control']
+
+
+@pytest.mark.parametrize('url', (
+    '/media/post_images/missing.jpg',
+    '/media/post_images/',
+    '/media/../settings.py',
+))
+def test_media_not_found(client, media, url):
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('mode, header, value', (
+    ('X-Sendfile', 'X-Sendfile', None),
+    ('X-Accel-Redirect', 'X-Accel-Redirect',
+     '/protected-media/post_images/photo.jpg'),
+))
+def test_media_sendfile(client, media, mode, header, value):
+    media.MEDIA_SENDFILE = mode
+    response = client.get('/media/post_images/photo.jpg')
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b'', (
+        'Убедитесь, что в режиме sendfile файл не читается приложением.'
+    )
+    expected = value or str(media.MEDIA_ROOT / 'post_images' / 'photo.jpg')
+    assert response[header] == expected
+    assert response['Content-Type'] == 'image/jpeg'
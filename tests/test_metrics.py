@@ -0,0 +1,99 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from core import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_root(tmp_path):
+    with override_settings(METRICS_ROOT=tmp_path):
+        yield tmp_path
+
+
+def _value(text, pattern):
+    match = re.search(rf'^{pattern} (\S+)$', text, re.MULTILINE)
+    assert match, f'Метрика {pattern} не найдена.'
+    return float(match.group(1))
+
+
+def test_metrics_endpoint(client, django_assert_num_queries):
+    client.get('/')
+    client.get('/')
+    client.get('/posts/999999/')
+    with django_assert_num_queries(0):
+        response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.content.decode()
+    assert '# TYPE blogicum_http_request_duration_seconds histogram' in text
+    assert _value(text, re.escape(
+        'blogicum_http_requests_total{method="GET",status="200",'
+        'view="blog:index"}')) == 2, (
+        'Убедитесь, что /metrics считает ответы по имени представления.'
+    )
+    assert _value(text, re.escape(
+        'blogicum_http_request_duration_seconds_bucket'
+        '{le="+Inf",view="blog:index"}')) == 2
+    assert _value(text, re.escape(
+        'blogicum_http_requests_total{method="GET",status="404",'
+        'view="blog:post_detail"}')) == 1
+    assert _value(text, re.escape(
+        'blogicum_db_queries_total{view="blog:index"}')) > 0
+    assert _value(text, re.escape(
+        'blogicum_cache_requests_total{kind="page",result="miss"}')) >= 1, (
+        'Убедитесь, что /metrics считает промахи кэша.'
+    )
+
+
+def test_metrics_aggregate_processes(metrics_root):
+    # Файл другого процесса рабочего сервера
+    other = metrics.MmapStore(metrics_root / '1')
+    other.add('blogicum_http_requests_total{view="blog:index"}', 3)
+    metrics.inc('blogicum_http_requests_total', view='blog:index')
+    values = metrics.read_values()
+    assert values['blogicum_http_requests_total{view="blog:index"}'] == 4, (
+        'Убедитесь, что метрики суммируются по процессам.'
+    )
+    # Повторное открытие файла продолжает счет
+    reopened = metrics.MmapStore(metrics_root / '1')
+    reopened.add('blogicum_http_requests_total{view="blog:index"}', 1)
+    assert metrics.read_values()[
+        'blogicum_http_requests_total{view="blog:index"}'] == 5
+
+
+def test_histogram_buckets_order():
+    name = 'blogicum_http_request_duration_seconds'
+    metrics.observe(name, 0.3, metrics.LATENCY_BUCKETS, view='blog:index')
+    metrics.observe(name, 3, metrics.LATENCY_BUCKETS, view='blog:detail')
+    lines = metrics.exposition(metrics.read_values()).splitlines()
+    for view in ('blog:detail', 'blog:index'):
+        bounds = [
+            float(re.search(r'le="([^"]+)"', line).group(1))
+            for line in lines
+            if line.startswith(f'{name}_bucket') and f'"{view}"' in line
+        ]
+        assert bounds == sorted(metrics.LATENCY_BUCKETS) + [float('inf')], (
+            'Убедитесь, что корзины гистограммы выводятся все и'
+            ' по возрастанию le, с +Inf последней.'
+        )
+    buckets = [line for line in lines if line.startswith(f'{name}_bucket')]
+    views = [re.search(r'view="([^"]+)"', line).group(1) for line in buckets]
+    assert views == sorted(views), (
+        'Убедитесь, что корзины одного ряда не перемежаются с корзинами'
+        ' других меток.'
+    )
+    assert _value('\n'.join(lines), re.escape(
+        f'{name}_bucket{{le="0.005",view="blog:index"}}')) == 0, (
+        'Убедитесь, что корзины ниже первого наблюдения записываются'
+        ' с нулевым значением.'
+    )
+
+
+def test_metrics_forbidden(client):
+    response = client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blog.models import Post
+from blog.querysets import posts_annotate_order
+from blog.views import ProfileListView
+from core.nplusone import NPlusOneError, detect_n_plus_one
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    return mixer.cycle(4).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True)
+
+
+def test_detect_in_code(posts):
+    with pytest.raises(NPlusOneError, match='Post.category'):
+        with detect_n_plus_one():
+            for post in Post.objects.all():
+                post.category.slug
+    with detect_n_plus_one():
+        for post in Post.objects.select_related('category'):
+            post.category.slug
+
+
+def test_detect_in_template(monkeypatch, user_client, user, posts):
+    # Выборка без select_related, как была в ветке хозяина профиля
+    monkeypatch.setattr(
+        ProfileListView, 'get_queryset',
+        lambda view: posts_annotate_order(view.object.posts))
+    with pytest.raises(NPlusOneError) as error:
+        user_client.get(f'/profile/{user.username}/')
+    assert 'includes/post_card.html' in str(error.value), (
+        'Убедитесь, что детектор N+1 сообщает строку шаблона.'
+    )
+
+
+def test_log_mode(monkeypatch, caplog, user_client, user, posts):
+    monkeypatch.setattr(
+        ProfileListView, 'get_queryset',
+        lambda view: posts_annotate_order(view.object.posts))
+    logger = logging.getLogger('blogicum.nplusone')
+    logger.addHandler(caplog.handler)
+    try:
+        with override_settings(NPLUSONE_DETECTION='log'):
+            response = user_client.get(f'/profile/{user.username}/')
+    finally:
+        logger.removeHandler(caplog.handler)
+    assert response.status_code == 200
+    assert any('Post.location' in record.getMessage()
+               for record in caplog.records), (
+        'Убедитесь, что в режиме log детектор пишет предупреждение.'
+    )
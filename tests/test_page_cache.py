@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _queries_number(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def urls(post_with_published_location, another_category):
+    post = post_with_published_location
+    return {
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+        'another_category': f'/category/{another_category.slug}/',
+        'profile': f'/profile/{post.author.username}/',
+        'detail': f'/posts/{post.id}/',
+    }
+
+
+def test_anonymous_pages_are_cached(client, urls):
+    for name, url in urls.items():
+        assert _queries_number(client, url), url
+        assert _queries_number(client, url) == 0, (
+            'Убедитесь, что повторный запрос страницы неавторизованным'
+            f' пользователем (`{url}`) отдается из кэша без запросов к БД.'
+        )
+
+
+def test_authenticated_pages_are_not_cached(user_client, urls):
+    _queries_number(user_client, urls['index'])
+    assert _queries_number(user_client, urls['index']), (
+        'Убедитесь, что страницы авторизованных пользователей не кэшируются.'
+    )
+
+
+def test_comment_invalidates_only_related_pages(
+        client, user_client, urls, post_with_published_location):
+    for url in urls.values():
+        _queries_number(client, url)
+    user_client.post(f'{urls["detail"]}comment/', {'text': 'Комментарий'})
+
+    for name in ('index', 'category', 'profile', 'detail'):
+        assert _queries_number(client, urls[name]), (
+            'Убедитесь, что новый комментарий сбрасывает кэш страниц,'
+            f' на которых выводится публикация (`{urls[name]}`).'
+        )
+    assert _queries_number(client, urls['another_category']) == 0, (
+        'Убедитесь, что новый комментарий не сбрасывает кэш страниц,'
+        ' на которых публикация не выводится.'
+    )
+    assert 'Комментарий' in client.get(urls['detail']).content.decode()
+
+
+def test_category_change_invalidates_pages(client, urls,
+                                           post_with_published_location):
+    _queries_number(client, urls['detail'])
+    category = post_with_published_location.category
+    category.is_published = False
+    category.save()
+    assert client.get(urls['detail']).status_code == 404, (
+        'Убедитесь, что снятие категории с публикации сбрасывает кэш'
+        ' страниц её публикаций.'
+    )
+
+
+def test_user_change_invalidates_profile(client, user):
+    url = f'/profile/{user.username}/'
+    _queries_number(client, url)
+    user.first_name = 'Новое имя'
+    user.save()
+    assert 'Новое имя' in client.get(url).content.decode(), (
+        'Убедитесь, что изменение профиля сбрасывает кэш его страницы.'
+    )
+    user.username = 'renamed'
+    user.save()
+    assert client.get(url).status_code == 404, (
+        'Убедитесь, что смена имени пользователя сбрасывает кэш страницы'
+        ' профиля по прежнему имени.'
+    )
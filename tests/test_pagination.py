@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer, user, published_category):
+    # Одинаковая дата у части публикаций проверяет вторую часть ключа (id).
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+
+
+def _collect_pages(client, url):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, {'cursor': cursor or ''})
+        assert response.status_code == 200, (
+            'Убедитесь, что страница ленты по курсору загружается.'
+        )
+        page_obj = response.context['page_obj']
+        seen.append([post.id for post in page_obj])
+        if not page_obj.has_next():
+            return seen, page_obj
+        cursor = page_obj.next_cursor
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_cursor_pagination_walks_all_posts(
+        client, user, published_category, posts_with_same_pub_date,
+        url_name):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    pages, last_page = _collect_pages(client, url)
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 3], (
+        'Убедитесь, что при keyset-пагинации на странице выводится'
+        f' не больше {N_PER_PAGE} публикаций.'
+    )
+    ids = [post_id for page in pages for post_id in page]
+    assert sorted(ids, reverse=True) == ids and len(set(ids)) == len(ids), (
+        'Убедитесь, что keyset-пагинация выводит каждую публикацию ровно'
+        ' один раз в порядке убывания (pub_date, id).'
+    )
+
+    response = client.get(url, {'cursor': last_page.previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == pages[-2], (
+        'Убедитесь, что ссылка на предыдущую страницу по курсору'
+        ' возвращает предыдущую страницу.'
+    )
+
+
+def test_cursor_pagination_setting(client, posts_with_same_pub_date):
+    with override_settings(POSTS_CURSOR_PAGINATION=True):
+        response = client.get('/')
+    page_obj = response.context['page_obj']
+    assert page_obj.is_cursor and page_obj.next_cursor, (
+        'Убедитесь, что настройка POSTS_CURSOR_PAGINATION включает'
+        ' keyset-пагинацию ленты.'
+    )
+    assert f'?cursor={page_obj.next_cursor}' in response.content.decode(), (
+        'Убедитесь, что в шаблоне пагинатора выводится ссылка'
+        ' на следующую страницу по курсору.'
+    )
+
+
+def test_invalid_cursor(client):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404, (
+        'Убедитесь, что для некорректного курсора возвращается ошибка 404.'
+    )
+
+
+def _count_queries(captured):
+    return [q for q in captured if q['sql'].startswith('SELECT COUNT(*)')]
+
+
+def test_page_count_is_cached(client, posts_with_same_pub_date):
+    with CaptureQueriesContext(connection) as first:
+        client.get('/')
+    with CaptureQueriesContext(connection) as second:
+        client.get('/?page=2')
+    assert _count_queries(first.captured_queries), (
+        'Убедитесь, что первая страница ленты считает число публикаций.'
+    )
+    assert not _count_queries(second.captured_queries), (
+        'Убедитесь, что число публикаций ленты берется из кэша'
+        ' при повторном запросе.'
+    )
+
+    post = posts_with_same_pub_date[0]
+    post.save()
+    with CaptureQueriesContext(connection) as after_save:
+        client.get('/')
+    assert _count_queries(after_save.captured_queries), (
+        'Убедитесь, что сохранение публикации сбрасывает кэшированное'
+        ' число публикаций.'
+    )
+
+
+def test_elided_page_range(client, mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE * 30).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    content = client.get('/?page=15').content.decode()
+    assert content.count('class="page-item') < 20, (
+        'Убедитесь, что в пагинаторе выводится сокращенный список страниц,'
+        ' а не ссылка на каждую страницу.'
+    )
+    assert '…' in content and '?page=30' in content
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from core import profiling
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def profiling_root(tmp_path):
+    with override_settings(PROFILING_ROOT=tmp_path, PROFILING_MAX_FILES=2):
+        yield tmp_path
+
+
+def test_profile_on_demand(admin_client, client, profiling_root):
+    response = admin_client.get('/', HTTP_X_PROFILE='1')
+    name = response['X-Profile-Id']
+    assert (profiling_root / f'{name}.pstats').exists(), (
+        'Убедитесь, что профиль запроса сохраняется в файл .pstats.'
+    )
+    assert 'get_response' in (
+        profiling_root / f'{name}.html').read_text(encoding='utf-8')
+    assert profiling.view_name(profiling_root / f'{name}.pstats') == (
+        'blog:index')
+    assert 'X-Profile-Id' not in client.get('/', {'_profile': '1'}), (
+        'Убедитесь, что профилировать запросы могут только сотрудники.'
+    )
+
+
+def test_profiles_capped(admin_client, profiling_root):
+    for _ in range(3):
+        admin_client.get('/', {'_profile': '1'})
+    assert len(list(profiling_root.glob('*.pstats'))) == 2
+    assert len(list(profiling_root.glob('*.html'))) == 2
+
+
+def test_sampling(client, profiling_root):
+    with override_settings(PROFILING_SAMPLE_RATE=1):
+        client.get('/')
+    assert len(profiling.list_profiles()) == 1
+
+
+def test_profile_report(admin_client, capsys):
+    admin_client.get('/', {'_profile': '1'})
+    call_command('profile_report')
+    assert 'blog:index: 1' in capsys.readouterr().out
+    call_command('profile_report', 'blog:index', limit=5)
+    assert 'cumulative' in capsys.readouterr().out
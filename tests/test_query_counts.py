@@ -0,0 +1,30 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_detail_queries(user_client, another_user_client, client,
+                             post_with_published_location, mixer,
+                             django_assert_num_queries):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    url = f'/posts/{post.id}/'
+    # Сессия, пользователь, публикация с автором, категорией
+    # и местоположением, комментарии с авторами.
+    with django_assert_num_queries(4):
+        user_client.get(url)
+    with django_assert_num_queries(4):
+        another_user_client.get(url)
+    with django_assert_num_queries(2):
+        client.get(url)
+
+
+def test_add_comment_queries(another_user_client,
+                             post_with_published_location,
+                             django_assert_num_queries):
+    url = f'/posts/{post_with_published_location.id}/comment/'
+    # Сессия, пользователь, публикация; в транзакции: вставка комментария,
+    # обновление счетчика и выборка лент для сброса кэша страниц.
+    with django_assert_num_queries(10):
+        response = another_user_client.post(url, {'text': 'Комментарий'})
+    assert response.status_code == 302
@@ -0,0 +1,86 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite',
+                       reason='Проверяется план запроса SQLite.'),
+]
+
+BAD_PLAN_STEPS = (
+    # Полный просмотр таблицы без индекса.
+    re.compile(r'^SCAN blog_\w+$'),
+    # Сортировка во временном B-дереве вместо чтения по индексу.
+    re.compile(r'USE TEMP B-TREE'),
+)
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    posts = mixer.cycle(N_PER_PAGE * 2).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+    )
+    mixer.cycle(3).blend('blog.Comment', post=posts[0])
+    return posts
+
+
+def _query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or 'blog_' not in sql:
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return response, plans
+
+
+def _assert_indexed(client, url):
+    response, plans = _query_plans(client, url)
+    for sql, steps in plans:
+        bad_steps = [
+            step for step in steps
+            if any(pattern.search(step) for pattern in BAD_PLAN_STEPS)
+        ]
+        assert not bad_steps, (
+            f'Убедитесь, что запросы страницы `{url}` используют индексы'
+            f' без полного просмотра таблиц и временной сортировки.\n'
+            f'Запрос: {sql}\nПлан: {steps}'
+        )
+    return response
+
+
+def test_list_views_use_indexes(
+        user, user_client, another_user_client, published_category,
+        feed_posts):
+    urls = (
+        '/',
+        '/?page=2',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    for url in urls:
+        _assert_indexed(another_user_client, url)
+    # Хозяин профиля видит и неопубликованные посты — другой запрос.
+    _assert_indexed(user_client, f'/profile/{user.username}/')
+
+    page_obj = _assert_indexed(Client(), '/?cursor=').context['page_obj']
+    _assert_indexed(Client(), f'/?cursor={page_obj.next_cursor}')
+
+
+def test_post_detail_comments_use_index(another_user_client, feed_posts):
+    _assert_indexed(another_user_client, f'/posts/{feed_posts[0].id}/')
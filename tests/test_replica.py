@@ -0,0 +1,171 @@
+import sqlite3
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+from core import routing
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=['default', 'replica']),
+]
+
+
+@pytest.fixture(autouse=True)
+def read_replica():
+    with override_settings(READ_REPLICA='replica'):
+        yield
+
+
+@pytest.fixture
+def stale_replica(tmp_path):
+    """Реплика — отдельный файл, обновляемый только вызовом sync()."""
+    target = tmp_path / 'replica.sqlite3'
+    primary = connections['default']
+    replica = primary.__class__(
+        {**primary.settings_dict, 'NAME': str(target)}, 'replica')
+    original = connections['replica']
+    connections['replica'] = replica
+
+    def sync():
+        call_command('sync_replica', target=str(target), stdout=None)
+
+    yield sync
+    replica.close()
+    connections['replica'] = original
+
+
+def _queries(client, url, method='get', **data):
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = getattr(client, method)(url, data)
+    return response, len(primary), len(replica)
+
+
+@pytest.mark.parametrize('url', [
+    '/', '/category/{category}/', '/profile/{username}/', '/posts/{post}/'])
+def test_read_views_use_replica(url, client, post_with_published_location):
+    post = post_with_published_location
+    url = url.format(category=post.category.slug,
+                     username=post.author.username, post=post.id)
+    # Данные только что созданы: без этого страницу читают из основной БД
+    with override_settings(REPLICA_STICKY_SECONDS=0):
+        response, primary, replica = _queries(client, url)
+    assert response.status_code == 200
+    assert replica and not primary, (
+        f'Убедитесь, что страница `{url}` читает данные из реплики.'
+    )
+
+
+def test_write_views_use_primary(user_client, post_with_published_location):
+    post = post_with_published_location
+    response, primary, replica = _queries(
+        user_client, f'/posts/{post.id}/comment/', 'post',
+        text='Комментарий')
+    assert response.status_code == 302
+    assert primary and not replica, (
+        'Убедитесь, что формы записи работают с основной БД.'
+    )
+
+
+def test_read_your_writes(user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    _, primary, replica = _queries(user_client, f'/posts/{post.id}/')
+    assert primary and not replica, (
+        'Убедитесь, что после записи пользователь читает страницы'
+        ' из основной БД.'
+    )
+    with override_settings(REPLICA_STICKY_SECONDS=0):
+        user_client.post(f'/posts/{post.id}/comment/', {'text': 'Еще'})
+        _, _, replica = _queries(user_client, f'/posts/{post.id}/')
+    assert replica, (
+        'Убедитесь, что по истечении REPLICA_STICKY_SECONDS чтение'
+        ' возвращается в реплику.'
+    )
+
+
+def test_sync_replica(tmp_path, post_with_published_location):
+    target = tmp_path / 'replica.sqlite3'
+    call_command('sync_replica', target=str(target), stdout=None)
+    with sqlite3.connect(target) as replica:
+        count, = replica.execute('SELECT COUNT(*) FROM blog_post').fetchone()
+    assert count == Post.objects.count(), (
+        'Убедитесь, что команда `sync_replica` копирует основную БД'
+        ' в файл реплики.'
+    )
+
+
+def test_page_cache_not_filled_from_stale_replica(
+        client, stale_replica, post_with_published_location):
+    post = post_with_published_location
+    stale_replica()
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get(f'/posts/{post.id}/')
+    assert 'Новый заголовок' in response.content.decode(), (
+        'Убедитесь, что страница, данные которой изменились за'
+        ' REPLICA_STICKY_SECONDS, читается из основной БД.'
+    )
+    with override_settings(REPLICA_STICKY_SECONDS=0):
+        cached = client.get(f'/posts/{post.id}/')
+        revalidated = client.get(f'/posts/{post.id}/',
+                                 HTTP_IF_NONE_MATCH=response['ETag'])
+    assert 'Новый заголовок' in cached.content.decode(), (
+        'Убедитесь, что в кэш страниц не попадает содержимое'
+        ' отстающей реплики.'
+    )
+    assert revalidated.status_code == 304
+
+
+def test_count_cache_not_filled_from_stale_replica(
+        stale_replica, post_with_published_location):
+    stale_replica()
+    post_with_published_location.delete()
+    token = routing.read_alias.set('replica')
+    try:
+        stale_count = CachedCountPaginator(
+            Post.objects.all(), 10, cache_key='test').count
+    finally:
+        routing.read_alias.reset(token)
+    assert stale_count == 1
+    assert CachedCountPaginator(
+        Post.objects.all(), 10, cache_key='test').count == 0, (
+        'Убедитесь, что число записей, посчитанное по отстающей реплике,'
+        ' не кэшируется.'
+    )
+
+
+def test_registration_reads_primary(client, stale_replica):
+    stale_replica()
+    password = 'Sl0zhnyi-parol'
+    response = client.post('/auth/registration/', {
+        'username': 'new-user', 'password1': password, 'password2': password})
+    assert response.status_code == 302
+    # Отметка в сессии действует и после того, как изменение страницы
+    # перестало считаться недавним
+    with override_settings(REPLICA_STICKY_SECONDS=0):
+        response = client.get('/profile/new-user/')
+    assert response.status_code == 200, (
+        'Убедитесь, что после регистрации пользователь читает свой профиль'
+        ' из основной БД.'
+    )
+
+
+def test_login_reads_primary(client, django_user_model, stale_replica):
+    stale_replica()
+    password = 'Sl0zhnyi-parol'
+    django_user_model.objects.create_user('new-user', password=password)
+    response = client.post('/auth/login/', {
+        'username': 'new-user', 'password': password})
+    assert response.status_code == 302
+    with override_settings(REPLICA_STICKY_SECONDS=0):
+        response = client.get('/profile/new-user/')
+    assert response.status_code == 200, (
+        'Убедитесь, что после входа пользователь читает страницы'
+        ' из основной БД.'
+    )
@@ -0,0 +1,46 @@
+import json
+import logging
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, location=None,
+                       category=published_category, is_published=True)
+
+
+@pytest.fixture
+def request_log(caplog):
+    logger = logging.getLogger('blogicum.requests')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def test_server_timing_for_staff(admin_client, client, post):
+    url = f'/posts/{post.pk}/'
+    header = admin_client.get(url)['Server-Timing']
+    metrics = dict(item.split(';', 1) for item in header.split(', '))
+    assert set(metrics) == {'db', 'tpl', 'total'}, (
+        'Убедитесь, что сотрудникам возвращается заголовок Server-Timing'
+        ' со временем SQL, шаблонов и запроса.'
+    )
+    assert 'SQL: ' in metrics['db']
+    assert 'Server-Timing' not in client.get(url), (
+        'Убедитесь, что заголовок Server-Timing не виден посетителям.'
+    )
+
+
+def test_request_log(client, request_log, post):
+    client.get(f'/posts/{post.pk}/')
+    record = json.loads(request_log.records[-1].getMessage())
+    assert record['view'] == 'blog:post_detail'
+    assert record['status'] == 200
+    assert record['queries'] > 0, (
+        'Убедитесь, что в журнал пишется число SQL-запросов.'
+    )
+    assert record['template_ms'] > 0
+    assert record['total_ms'] >= record['db_ms'] + record['template_ms']
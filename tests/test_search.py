@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make_post(title, text='Текст', **kwargs):
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(hours=1))
+        return mixer.blend('blog.Post', author=user, location=None,
+                           category=published_category, title=title,
+                           text=text, **kwargs)
+    return make_post
+
+
+def _titles(response):
+    return [post.title for post in response.context['page_obj']]
+
+
+def test_search_ranking(client, make_post):
+    make_post('Про котов', 'Рассказ о домашних питомцах')
+    make_post('Прогулка', 'Встретили кота во дворе')
+    make_post('Погода', 'Шел дождь')
+    response = client.get('/search/', {'q': 'кот'})
+    assert _titles(response) == ['Про котов', 'Прогулка'], (
+        'Убедитесь, что поиск находит публикации по началу слова'
+        ' и выше ставит совпадения в заголовке.'
+    )
+    assert _titles(client.get('/', {'q': 'кот'})) == [
+        'Про котов', 'Прогулка'], (
+        'Убедитесь, что лента поддерживает поиск параметром q.'
+    )
+
+
+def test_search_visibility(client, make_post):
+    make_post('Черновик про котов', is_published=False)
+    make_post('Будущее про котов',
+              pub_date=timezone.now() + timedelta(days=1))
+    assert _titles(client.get('/search/', {'q': 'котов'})) == [], (
+        'Убедитесь, что поиск не показывает скрытые публикации.'
+    )
+
+
+def test_search_index_sync(client, mixer, user, make_post):
+    post = make_post('Заметка')
+    comment = mixer.blend('blog.Comment', post=post, author=user,
+                          text='Отличная фотография')
+    assert _titles(client.get('/search/', {'q': 'фотография'})) == [
+        'Заметка'], 'Убедитесь, что поиск учитывает текст комментариев.'
+
+    comment.delete()
+    post.title = 'Новый заголовок'
+    post.save()
+    assert _titles(client.get('/search/', {'q': 'фотография'})) == []
+    assert _titles(client.get('/search/', {'q': 'новый'})) == [
+        'Новый заголовок'], (
+        'Убедитесь, что индекс поиска обновляется при изменении поста.'
+    )
+
+
+def test_search_comment_rows(client, mixer, user, make_post):
+    post = make_post('Кот на крыше')
+    another = make_post('Пейзаж')
+    comment = mixer.blend('blog.Comment', post=post, author=user,
+                          text='Кот спрыгнул')
+    mixer.blend('blog.Comment', post=post, author=user, text='Кот ушел')
+    assert _titles(client.get('/search/', {'q': 'кот'})) == [
+        'Кот на крыше'], (
+        'Убедитесь, что публикация выводится в результатах поиска один раз,'
+        ' даже если совпали и ее текст, и комментарии.'
+    )
+    comment.text = 'Прекрасный закат'
+    comment.post = another
+    comment.save()
+    assert _titles(client.get('/search/', {'q': 'закат'})) == ['Пейзаж'], (
+        'Убедитесь, что индекс поиска обновляется при изменении'
+        ' и переносе комментария.'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT comments FROM blog_post_search'
+                       ' WHERE rowid = %s', [post.pk])
+        assert cursor.fetchone() == ('',), (
+            'Убедитесь, что комментарии индексируются отдельными строками,'
+            ' а не пересобираются в строке публикации.'
+        )
+
+
+def test_search_cursor_pagination(client, make_post):
+    for number in range(15):
+        make_post(f'Публикация {number}', 'общий текст')
+    first = client.get('/search/', {'q': 'общий'})
+    page = first.context['page_obj']
+    assert page.is_cursor and len(page) == 10
+    second = client.get('/search/', {'q': 'общий',
+                                     'cursor': page.next_cursor})
+    titles = _titles(first) + _titles(second)
+    assert sorted(titles) == sorted(
+        f'Публикация {number}' for number in range(15)), (
+        'Убедитесь, что результаты поиска разбиты на страницы курсором.'
+    )
+
+
+@pytest.mark.parametrize('query', ('"', 'AND', '*', 'NEAR(', '-'))
+def test_search_syntax_is_escaped(client, make_post, query):
+    make_post('Заголовок')
+    assert client.get('/search/', {'q': query}).status_code == 200
+
+
+def test_rebuild_search_index(client, make_post):
+    make_post('Восстановление')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_search')
+    call_command('rebuild_search_index', verbosity=0)
+    assert _titles(client.get('/search/', {'q': 'восстановление'})) == [
+        'Восстановление'], (
+        'Убедитесь, что команда `rebuild_search_index` заполняет индекс.'
+    )
+
+
+def test_search_cache_follows_comments(client, mixer, user, make_post):
+    post = make_post('Заметка')
+    comment = mixer.blend('blog.Comment', post=post, author=user,
+                          text='Старый текст')
+    response = client.get('/search/', {'q': 'старый'})
+    assert _titles(response) == ['Заметка']
+    comment.text = 'Новый текст'
+    comment.save()
+    response = client.get('/search/', {'q': 'старый'},
+                          HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 200 and _titles(response) == [], (
+        'Убедитесь, что правка комментария сбрасывает кэш и ETag'
+        ' страниц поиска.'
+    )
@@ -0,0 +1,30 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+def _pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_connection_pragmas():
+    assert _pragma('synchronous') == 1, (
+        'Убедитесь, что соединения SQLite настраиваются'
+        ' по SQLITE_PRAGMAS (synchronous=NORMAL).'
+    )
+    assert _pragma('busy_timeout') == 5000
+    assert _pragma('temp_store') == 2
+    assert _pragma('cache_size') == -64 * 1024
+
+
+@pytest.mark.django_db(transaction=True)
+def test_immediate_transactions():
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            _pragma('user_version')
+    assert queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+        'Убедитесь, что транзакции сразу берут блокировку записи.'
+    )
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.querysets import posts_filter
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _is_visible(post):
+    return Post.objects.values_list('is_visible', flat=True).get(pk=post.pk)
+
+
+def test_visibility_on_save(mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True,
+                       pub_date=timezone.now() - timedelta(hours=1))
+    assert _is_visible(post), (
+        'Убедитесь, что опубликованный пост с наступившей датой публикации'
+        ' в опубликованной категории отмечается видимым.'
+    )
+    post.is_published = False
+    post.save()
+    assert not _is_visible(post), (
+        'Убедитесь, что снятие поста с публикации скрывает его.'
+    )
+
+
+def test_category_toggle_updates_posts(mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1))
+    published_category.is_published = False
+    published_category.save()
+    assert not any(_is_visible(post) for post in posts), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert all(_is_visible(post) for post in posts)
+
+    published_category.delete()
+    assert not any(_is_visible(post) for post in posts), (
+        'Убедитесь, что посты удаленной категории скрываются.'
+    )
+
+
+def test_publish_scheduled(client, mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       is_published=True,
+                       pub_date=timezone.now() + timedelta(hours=1))
+    assert not _is_visible(post)
+    assert post.title not in client.get('/').content.decode()
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    call_command('publish_scheduled', once=True, verbosity=0)
+    assert _is_visible(post), (
+        'Убедитесь, что команда `publish_scheduled` открывает отложенные'
+        ' публикации, дата которых наступила.'
+    )
+    assert post.title in client.get('/').content.decode(), (
+        'Убедитесь, что планировщик сбрасывает кэш лент при публикации.'
+    )
+
+
+def test_feed_filter_has_no_category_join():
+    sql = str(posts_filter(Post.objects.all()).query)
+    assert 'blog_category' not in sql, (
+        'Убедитесь, что фильтр видимости ленты не объединяет публикации'
+        ' с таблицей категорий.'
+    )
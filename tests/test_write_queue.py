@@ -0,0 +1,156 @@
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+from django.db import transaction
+from django.test import override_settings
+
+from blog.cache import bump_version, get_version
+from blog.forms import CommentForm
+from blog.models import Category, Comment
+from core import writes
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def host_queue(tmp_path):
+    with override_settings(SQLITE_WRITE_QUEUE='host',
+                           SQLITE_WRITE_LOCK_FILE=tmp_path / 'db.lock',
+                           SQLITE_WRITE_BATCH_WAIT=0.05):
+        yield writes.write_queue
+
+
+def _create_category(number):
+    return Category.objects.create(
+        title=f'Категория {number}', description='Описание',
+        slug=f'category-{number}').pk
+
+
+def test_disabled_queue_calls_directly():
+    thread = []
+    result = writes.run(lambda: thread.append(threading.current_thread()))
+    assert result is None
+    assert thread == [threading.current_thread()], (
+        'Убедитесь, что без SQLITE_WRITE_QUEUE обработчик записи'
+        ' вызывается в потоке запроса.'
+    )
+
+
+def test_concurrent_writes_grouped(host_queue):
+    number = 8
+    barrier = threading.Barrier(number)
+    results = [None] * number
+
+    def write(index):
+        barrier.wait()
+        results[index] = writes.run(lambda: _create_category(index))
+
+    batches = host_queue.batches
+    threads = [threading.Thread(target=write, args=(index,))
+               for index in range(number)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert set(results) == set(
+        Category.objects.values_list('pk', flat=True)), (
+        'Убедитесь, что очередь записи возвращает результат обработчика'
+        ' вызывающему потоку.'
+    )
+    assert host_queue.batches - batches < number, (
+        'Убедитесь, что поток записи выполняет накопившиеся записи'
+        ' одной транзакцией.'
+    )
+
+
+def test_error_isolated_in_batch(host_queue):
+    def fail():
+        _create_category('failed')
+        raise ValueError('Ошибка обработчика')
+
+    failed = host_queue.submit(fail)
+    created = host_queue.submit(lambda: _create_category(1))
+    with pytest.raises(ValueError):
+        failed.result(timeout=5)
+    assert created.result(timeout=5)
+    assert list(Category.objects.values_list('slug', flat=True)) == [
+        'category-1'], (
+        'Убедитесь, что ошибка обработчика откатывает только его'
+        ' изменения, а остальные записи группы фиксируются.'
+    )
+
+
+def test_comment_through_queue(host_queue, user_client,
+                               post_with_published_location):
+    post = post_with_published_location
+    response = user_client.post(f'/posts/{post.id}/comment/',
+                                {'text': 'Комментарий'})
+    assert response.status_code == 302
+    assert Comment.objects.filter(post=post).count() == 1, (
+        'Убедитесь, что форма комментария работает с очередью записи.'
+    )
+
+
+def test_only_save_queued(host_queue, user_client, monkeypatch,
+                          post_with_published_location):
+    post = post_with_published_location
+    clean_threads = []
+    clean = CommentForm.clean
+
+    def record_clean(form):
+        clean_threads.append(threading.current_thread())
+        return clean(form)
+
+    monkeypatch.setattr(CommentForm, 'clean', record_clean)
+    batches = host_queue.batches
+    response = user_client.post('/posts/create/', {'title': ''})
+    assert response.status_code == 200
+    assert host_queue.batches == batches, (
+        'Убедитесь, что форма с ошибками не передается в очередь записи.'
+    )
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    assert host_queue.batches == batches + 1
+    assert host_queue.thread not in clean_threads, (
+        'Убедитесь, что проверка формы выполняется в потоке запроса,'
+        ' а в очередь записи передается только сохранение.'
+    )
+    comment = Comment.objects.get(post=post)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert not Comment.objects.filter(post=post).exists(), (
+        'Убедитесь, что удаление комментария работает с очередью записи.'
+    )
+
+
+def test_timed_out_write_cancelled(host_queue):
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    blocking = host_queue.submit(block)
+    started.wait(5)
+    try:
+        with override_settings(SQLITE_WRITE_TIMEOUT=0.01):
+            with pytest.raises(TimeoutError):
+                writes.run(lambda: _create_category(1))
+    finally:
+        release.set()
+    blocking.result(timeout=5)
+    host_queue.submit(lambda: None).result(timeout=5)
+    assert not Category.objects.exists(), (
+        'Убедитесь, что запись, не дождавшаяся очереди, отменяется'
+        ' и не фиксируется после ошибки у вызывающего.'
+    )
+
+
+def test_version_bumped_after_commit():
+    with transaction.atomic():
+        bump_version('posts')
+        inside = get_version('posts')
+    assert get_version('posts') > inside, (
+        'Убедитесь, что версии кэша увеличиваются повторно после'
+        ' фиксации транзакции.'
+    )